@@ -0,0 +1,91 @@
+import argparse
+from pathlib import Path
+import shutil
+import subprocess
+import sys
+import tempfile
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from prooflog import DEFAULT_COMMAND, Verifier
+
+
+ROOT = Path(__file__).resolve().parent.parent
+RUNNERS = ['dag', 'interval-scheduling', 'knapsack']
+
+
+def red_coefficients(proof_path):
+    """The largest absolute coefficient over the red rules of a proof, and how many digits they have in total."""
+    largest = digits = 0
+    with proof_path.open() as f:
+        for line in f:
+            if not line.startswith('red '):
+                continue
+            tokens = line.split()
+            for coefficient in tokens[1:tokens.index('>=')][::2]:
+                coefficient = coefficient.lstrip('-')
+                largest = max(largest, int(coefficient))
+                digits += len(coefficient)
+    return largest, digits
+
+
+def check(command, instance):
+    verifier = Verifier(command, instance.with_suffix('.opb'))
+    with verifier.start() as pipe, instance.with_suffix('.veripb').open() as proof:
+        shutil.copyfileobj(proof, pipe)
+    if verifier.finish() != 0:
+        sys.exit(f'{instance.name}: verifier exited with status {verifier.returncode}')
+    return verifier.seconds
+
+
+def measure(root, runner, instance, command):
+    subprocess.run([sys.executable, root / runner / 'run.py', instance], check=True)
+    largest, digits = red_coefficients(instance.with_suffix('.veripb'))
+    result = f'max {largest:8d} digits {digits:9d} bytes {instance.with_suffix(".veripb").stat().st_size:10d}'
+    if command is not None:
+        result += f' check {check(command, instance):6.2f}s'
+    return result
+
+
+def main(args):
+    roots = {'baseline': Path(args.baseline).resolve()} if args.baseline is not None else {}
+    roots['current'] = ROOT
+    instances = sorted(Path(args.sample_dir).glob(f'*.{args.extension}'))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for instance in instances:
+            results = dict()
+            for label, root in roots.items():
+                copy = Path(tmp_dir) / label / instance.name
+                copy.parent.mkdir(exist_ok=True)
+                shutil.copy(instance, copy)
+                results[label] = measure(root, args.runner, copy, args.verify)
+            print(f'{instance.stem:>20}: ' + ', '.join(f'{label} {result}' for label, result in results.items()))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Report the size of the coefficients in the red rules of each proof, the proof size "
+                    "and optionally the time taken to check it, for this tree and optionally another checkout"
+    )
+    parser.add_argument(
+        "runner", choices=RUNNERS, help="Which run.py to benchmark"
+    )
+    parser.add_argument(
+        "sample_dir", help="Directory of instances, as made by produce-instances.sh"
+    )
+    parser.add_argument(
+        "--extension",
+        required=False,
+        default='txt',
+        help="Instance filename extension",
+    )
+    parser.add_argument(
+        "--baseline",
+        required=False,
+        help="Another checkout of this repository to compare with, e.g. made with git worktree add",
+    )
+    parser.add_argument(
+        "--verify", metavar="COMMAND", nargs="?", const=DEFAULT_COMMAND,
+        help=f"Time a checker reading each proof on its standard input (default command: {DEFAULT_COMMAND})",
+    )
+    args = parser.parse_args()
+    main(args)
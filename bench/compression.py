@@ -0,0 +1,70 @@
+import argparse
+import importlib.util
+from pathlib import Path
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from prooflog import COMPRESSIONS, with_compression_suffix
+
+
+RUNNERS = {
+    'dag': Path(__file__).resolve().parent.parent / 'dag' / 'run.py',
+    'interval-scheduling': Path(__file__).resolve().parent.parent / 'interval-scheduling' / 'run.py',
+}
+
+
+def available(compress):
+    return compress != 'zstd' or importlib.util.find_spec('zstandard') is not None
+
+
+def output_bytes(instance_path, compress):
+    return sum(
+        with_compression_suffix(instance_path.with_suffix(suffix), compress).stat().st_size
+        for suffix in ['.opb', '.veripb']
+    )
+
+
+def main(args):
+    instances = sorted(Path(args.sample_dir).glob(f'*.{args.extension}'))
+    modes = [c for c in COMPRESSIONS if available(c)]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for instance in instances:
+            shutil.copy(instance, tmp_dir)
+        instances = [Path(tmp_dir) / instance.name for instance in instances]
+        results = dict()
+        for compress in modes:
+            start = time.perf_counter()
+            for instance in instances:
+                subprocess.run([sys.executable, RUNNERS[args.runner], instance, '--compress', compress], check=True)
+            results[compress] = (
+                time.perf_counter() - start,
+                sum(output_bytes(instance, compress) for instance in instances),
+            )
+    base_time, base_bytes = results['none']
+    for compress, (elapsed, n_bytes) in results.items():
+        print(f'{compress:>5}: {n_bytes:12d} bytes, ratio {base_bytes / n_bytes:6.2f}, '
+              f'{elapsed:8.2f}s ({elapsed / base_time:4.2f}x)')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Compare output size and run time of the compression modes"
+    )
+    parser.add_argument(
+        "runner", choices=list(RUNNERS), help="Which run.py to benchmark"
+    )
+    parser.add_argument(
+        "sample_dir", help="Directory of instances, as made by produce-instances.sh"
+    )
+    parser.add_argument(
+        "--extension",
+        required=False,
+        default='txt',
+        help="Instance filename extension",
+    )
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,51 @@
+import argparse
+import importlib.util
+from pathlib import Path
+import subprocess
+import sys
+import tempfile
+import time
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def load_runner():
+    spec = importlib.util.spec_from_file_location('dag_run', ROOT / 'dag' / 'run.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def main(args):
+    run = load_runner()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_dir = Path(tmp_dir)
+        subprocess.run([
+            sys.executable, ROOT / 'dag' / 'generate.py',
+            '--output-dir', tmp_dir, '--prefix', 'scale', '--num-samples', str(args.num_samples),
+            '--seed', '0', '--min-size', str(args.min_size), '--max-size', str(args.max_size),
+            '--edge-probability-pct', str(args.edge_probability_pct),
+        ], check=True)
+        for instance in sorted(tmp_dir.glob('*.txt'), key=lambda p: int(p.stem.split('_')[-1])):
+            start = time.perf_counter()
+            graph = run.Graph(*run.parse_instance(instance))
+            run.generate_formula(graph, instance.with_suffix('.opb'))
+            elapsed = time.perf_counter() - start
+            n_edges = len(graph.edges)
+            print(f'{graph.n_vertices:8d} vertices {n_edges:8d} edges: '
+                  f'{elapsed:7.3f}s, {1e6 * elapsed / n_edges:6.2f} us/edge')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Time parsing, indexing and formula generation for growing DAG instances"
+    )
+    parser.add_argument("--num-samples", type=int, required=False, default=5, help="Number of sizes")
+    parser.add_argument("--min-size", type=int, required=False, default=1000, help="Smallest number of edges")
+    parser.add_argument("--max-size", type=int, required=False, default=64000, help="Largest number of edges")
+    parser.add_argument(
+        "--edge-probability-pct", type=int, required=False, default=15, help="Edge probability passed to generate.py"
+    )
+    args = parser.parse_args()
+    main(args)
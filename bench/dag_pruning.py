@@ -0,0 +1,47 @@
+import argparse
+from pathlib import Path
+import subprocess
+import sys
+import tempfile
+import time
+
+
+ROOT = Path(__file__).resolve().parent.parent
+MODES = {
+    'dp': [],
+    'pruned': ['--prune'],
+}
+
+
+def main(args):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_dir = Path(tmp_dir)
+        subprocess.run([
+            sys.executable, ROOT / 'dag' / 'generate.py',
+            '--output-dir', tmp_dir, '--prefix', 'sparse', '--num-samples', str(args.num_samples),
+            '--seed', '0', '--min-size', str(args.min_size), '--max-size', str(args.max_size),
+            '--edge-probability-pct', str(args.edge_probability_pct),
+        ], check=True)
+        for instance in sorted(tmp_dir.glob('*.txt'), key=lambda p: int(p.stem.split('_')[-1])):
+            results = dict()
+            for mode, flags in MODES.items():
+                start = time.perf_counter()
+                subprocess.run([sys.executable, ROOT / 'dag' / 'run.py', instance, *flags], check=True)
+                results[mode] = (time.perf_counter() - start, instance.with_suffix('.veripb').stat().st_size)
+            print(f'{instance.stem:>20}: ' + ', '.join(
+                f'{mode} {n_bytes:10d} bytes {elapsed:6.2f}s' for mode, (elapsed, n_bytes) in results.items()
+            ))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Compare proof size and run time of DAG proofs with and without reachability pruning"
+    )
+    parser.add_argument("--num-samples", type=int, required=False, default=4, help="Number of sizes")
+    parser.add_argument("--min-size", type=int, required=False, default=2000, help="Smallest number of edges")
+    parser.add_argument("--max-size", type=int, required=False, default=16000, help="Largest number of edges")
+    parser.add_argument(
+        "--edge-probability-pct", type=int, required=False, default=1, help="Edge probability passed to generate.py"
+    )
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,67 @@
+import argparse
+import importlib.util
+from pathlib import Path
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from prooflog import TermTable
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def load_runner():
+    spec = importlib.util.spec_from_file_location('interval_run', ROOT / 'interval-scheduling' / 'run.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class FormatEveryTime(TermTable):
+    # Formats the terms of every line afresh, as declare_merge used to; the
+    # value ranges used for the big-M coefficients still come from TermTable
+    def __init__(self, weights, names):
+        self.names = list(names)
+        super().__init__(weights, self.names)
+
+
+    def prefix(self, count, negated=False):
+        return [f'{-w if negated else w} {name}' for w, name in zip(self.weights[:count], self.names[:count])]
+
+
+    def select(self, indices, negated=False):
+        return [f'{-self.weights[i] if negated else self.weights[i]} {self.names[i]}' for i in indices]
+
+
+
+def main(args):
+    run = load_runner()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_dir = Path(tmp_dir)
+        subprocess.run([
+            sys.executable, ROOT / 'interval-scheduling' / 'generate.py',
+            '--output-dir', tmp_dir, '--prefix', 'merge', '--num-samples', '2', '--seed', '0',
+            '--min-size', str(args.size), '--max-size', str(args.size),
+            '--min-time', '1000', '--max-time', '2000', '--avg-time', '200',
+        ], check=True)
+        instance = next(tmp_dir.glob('*.txt'))
+        intervals = run.parse_instance(instance)
+        pairs = run.generate_formula(intervals, instance.with_suffix('.opb'))
+        for name, terms in [('format every line', FormatEveryTime), ('term table', TermTable)]:
+            run.TermTable = terms
+            start = time.perf_counter()
+            run.ProofManager(intervals, pairs, instance.with_suffix('.veripb')).run()
+            elapsed = time.perf_counter() - start
+            print(f'{name:>17}: {elapsed:.3f}s for {len(intervals)} calls to declare_merge')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Time interval scheduling proof generation with and without cached term strings"
+    )
+    parser.add_argument("--size", type=int, required=False, default=1500, help="Number of intervals")
+    args = parser.parse_args()
+    main(args)
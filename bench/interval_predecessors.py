@@ -0,0 +1,70 @@
+import argparse
+import importlib.util
+from pathlib import Path
+import subprocess
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def load_runner():
+    spec = importlib.util.spec_from_file_location('interval_run', ROOT / 'interval-scheduling' / 'run.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def linear_walk(manager):
+    # The backwards scan that ProofManager.next_available used to do per prefix
+    res = list()
+    for ix, (_, last_start, _, _) in enumerate(manager.intervals_sorted):
+        last_avail_index = ix - 1
+        while last_avail_index >= 0 and manager.intervals_sorted[last_avail_index][2] > last_start:
+            last_avail_index -= 1
+        res.append(last_avail_index)
+    return res
+
+
+def main(args):
+    run = load_runner()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_dir = Path(tmp_dir)
+        subprocess.run([
+            sys.executable, ROOT / 'interval-scheduling' / 'generate.py',
+            '--output-dir', tmp_dir, '--prefix', 'scale', '--num-samples', str(args.num_samples),
+            '--seed', '0', '--min-size', str(args.min_size), '--max-size', str(args.max_size),
+            '--min-time', str(args.max_time), '--max-time', str(args.max_time), '--avg-time', str(args.avg_time),
+        ], check=True)
+        for instance in sorted(tmp_dir.glob('*.txt'), key=lambda p: int(p.stem.split('_')[-1])):
+            intervals = run.parse_instance(instance)
+            manager = SimpleNamespace(intervals_sorted=sorted(
+                ((ix, *i) for ix, i in enumerate(intervals)), key=lambda x: x[2]
+            ))
+            starts = [start for _, start, _, _ in manager.intervals_sorted]
+            finishes = [finish for _, _, finish, _ in manager.intervals_sorted]
+            timings = dict()
+            for name, fn in [
+                ('linear', lambda: linear_walk(manager)), ('bisect', lambda: run.last_compatible(starts, finishes))
+            ]:
+                start = time.perf_counter()
+                timings[name] = (list(fn()), time.perf_counter() - start)
+            assert timings['linear'][0] == timings['bisect'][0]
+            print(f'{len(intervals):8d} intervals: linear {timings["linear"][1]:7.3f}s, '
+                  f'bisect {timings["bisect"][1]:7.3f}s')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Compare predecessor computation for interval scheduling instances with long intervals"
+    )
+    parser.add_argument("--num-samples", type=int, required=False, default=4, help="Number of sizes")
+    parser.add_argument("--min-size", type=int, required=False, default=1000, help="Fewest intervals")
+    parser.add_argument("--max-size", type=int, required=False, default=8000, help="Most intervals")
+    parser.add_argument("--max-time", type=int, required=False, default=2000, help="Total duration")
+    parser.add_argument("--avg-time", type=float, required=False, default=1000, help="Average interval length")
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,54 @@
+import argparse
+from pathlib import Path
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+
+RUNNERS = {
+    'dag': Path(__file__).resolve().parent.parent / 'dag' / 'run.py',
+    'interval-scheduling': Path(__file__).resolve().parent.parent / 'interval-scheduling' / 'run.py',
+}
+MODES = {
+    'dp': [],
+    'prefix-sums': ['--prefix-sums'],
+}
+
+
+def main(args):
+    instances = sorted(Path(args.sample_dir).glob(f'*.{args.extension}'))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for instance in instances:
+            shutil.copy(instance, tmp_dir)
+        instances = [Path(tmp_dir) / instance.name for instance in instances]
+        for instance in instances:
+            results = dict()
+            for mode, flags in MODES.items():
+                start = time.perf_counter()
+                subprocess.run([sys.executable, RUNNERS[args.runner], instance, *flags], check=True)
+                results[mode] = (time.perf_counter() - start, instance.with_suffix('.veripb').stat().st_size)
+            print(f'{instance.stem:>20}: ' + ', '.join(
+                f'{mode} {n_bytes:10d} bytes {elapsed:6.2f}s' for mode, (elapsed, n_bytes) in results.items()
+            ))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Compare proof size and run time of the DP and prefix-sum proofs"
+    )
+    parser.add_argument(
+        "runner", choices=list(RUNNERS), help="Which run.py to benchmark"
+    )
+    parser.add_argument(
+        "sample_dir", help="Directory of instances, as made by produce-instances.sh"
+    )
+    parser.add_argument(
+        "--extension",
+        required=False,
+        default='txt',
+        help="Instance filename extension",
+    )
+    args = parser.parse_args()
+    main(args)
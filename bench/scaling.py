@@ -0,0 +1,182 @@
+import argparse
+import json
+from math import log
+from pathlib import Path
+import subprocess
+import sys
+import tempfile
+
+
+ROOT = Path(__file__).resolve().parent.parent
+RUNNERS = {
+    'dag': ROOT / 'dag',
+    'interval-scheduling': ROOT / 'interval-scheduling',
+}
+FORMULA_PHASES = ['parse_instance', 'generate_formula']
+
+
+def generate(runner, sample_dir, args, generator_args):
+    subprocess.run([
+        sys.executable, RUNNERS[runner] / 'generate.py',
+        '--output-dir', sample_dir, '--prefix', 'bench',
+        '--num-samples', str(args.num_samples), '--seed', str(args.seed),
+        *generator_args,
+    ], check=True)
+    # Files are named bench_<ix>_<size>.txt
+    return sorted(Path(sample_dir).glob('bench_*.txt'), key=lambda p: int(p.stem.rsplit('_', 1)[1]))
+
+
+def measure(runner, instance, flags):
+    stats_path = instance.with_suffix('.json')
+    subprocess.run([sys.executable, RUNNERS[runner] / 'run.py', instance, *flags, '--stats', stats_path], check=True)
+    stats = json.loads(stats_path.read_text())
+    phases = stats['phases']
+    return {
+        'formula_seconds': sum(phases[name]['seconds'] for name in FORMULA_PHASES),
+        'proof_seconds': sum(phase['seconds'] for name, phase in phases.items() if name not in FORMULA_PHASES),
+        'bytes': sum(stats['outputs'].values()),
+        'peak_rss_kib': max(phase['peak_rss_kib'] for phase in phases.values()),
+    }
+
+
+def best_of(runs):
+    # Fastest time over repeats; sizes do not change between runs
+    best = dict(runs[0])
+    for key in ['formula_seconds', 'proof_seconds', 'peak_rss_kib']:
+        best[key] = min(run[key] for run in runs)
+    return best
+
+
+def slope(results, key):
+    # Least squares exponent k of key ~ size^k, to spot superlinear growth
+    points = [(log(r['size']), log(r[key])) for r in results if r['size'] > 0 and r[key] > 0]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if var_x == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+
+
+def regressions(results, baseline, args):
+    old = {r['instance']: r for r in baseline['results']}
+    found = list()
+    for r in results:
+        if r['instance'] not in old:
+            continue
+        before = old[r['instance']]
+        for key in ['formula_seconds', 'proof_seconds']:
+            if r[key] > before[key] * (1 + args.time_threshold) and r[key] - before[key] > args.min_seconds:
+                found.append(f'{r["instance"]}: {key} {before[key]:.3f} -> {r[key]:.3f}')
+        if r['bytes'] > before['bytes'] * (1 + args.bytes_threshold):
+            found.append(f'{r["instance"]}: bytes {before["bytes"]} -> {r["bytes"]}')
+    return found
+
+
+def main(args, generator_args):
+    flags = ['--prefix-sums'] if args.prefix_sums else []
+    with tempfile.TemporaryDirectory() as sample_dir:
+        instances = generate(args.runner, sample_dir, args, generator_args)
+        results = list()
+        for instance in instances:
+            result = best_of([measure(args.runner, instance, flags) for _ in range(args.repeats)])
+            results.append({'instance': instance.stem, 'size': int(instance.stem.rsplit('_', 1)[1]), **result})
+            print(f'{instance.stem:>20}: formula {result["formula_seconds"]:7.3f}s, proof {result["proof_seconds"]:7.3f}s, '
+                  f'{result["bytes"]:12d} bytes, {result["peak_rss_kib"] // 1024:6d} MiB')
+    for key in ['proof_seconds', 'bytes']:
+        exponent = slope(results, key)
+        if exponent is not None:
+            print(f'{key} grows as size^{exponent:.2f}')
+
+    report = {
+        'runner': args.runner,
+        'flags': flags,
+        'seed': args.seed,
+        'generator_args': generator_args,
+        'results': results,
+    }
+    if args.save:
+        Path(args.save).write_text(json.dumps(report, indent=2) + '\n')
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        if (baseline['runner'], baseline['flags'], baseline['seed'], baseline['generator_args']) != \
+                (args.runner, flags, args.seed, generator_args):
+            sys.exit('Baseline was recorded with different instances or flags')
+        found = regressions(results, baseline, args)
+        for line in found:
+            print(f'REGRESSION {line}')
+        if found:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Time a runner over a seeded size sweep and compare against a saved baseline. "
+                    "Unrecognised arguments, such as --min-size, --max-size or --edge-probability-pct, "
+                    "are passed on to the runner's generate.py"
+    )
+    parser.add_argument(
+        "runner", choices=list(RUNNERS), help="Which run.py to benchmark"
+    )
+    parser.add_argument(
+        "--num-samples",
+        "-n",
+        required=False,
+        type=int,
+        default=5,
+        help="Number of sizes in the sweep",
+    )
+    parser.add_argument(
+        "--seed",
+        "-s",
+        required=False,
+        type=int,
+        default=0,
+        help="Random seed for the generator",
+    )
+    parser.add_argument(
+        "--repeats",
+        required=False,
+        type=int,
+        default=1,
+        help="Runs per instance; the fastest is kept",
+    )
+    parser.add_argument(
+        "--prefix-sums",
+        action='store_true',
+        help="Benchmark the prefix-sum proofs",
+    )
+    parser.add_argument(
+        "--save",
+        required=False,
+        help="Write the results to this JSON file",
+    )
+    parser.add_argument(
+        "--baseline",
+        required=False,
+        help="JSON file from an earlier --save to compare against",
+    )
+    parser.add_argument(
+        "--time-threshold",
+        required=False,
+        type=float,
+        default=0.25,
+        help="Allowed relative slowdown of either phase before failing",
+    )
+    parser.add_argument(
+        "--min-seconds",
+        required=False,
+        type=float,
+        default=0.05,
+        help="Slowdowns smaller than this many seconds are ignored as noise",
+    )
+    parser.add_argument(
+        "--bytes-threshold",
+        required=False,
+        type=float,
+        default=0.0,
+        help="Allowed relative growth of the formula and proof files before failing",
+    )
+    main(*parser.parse_known_args())
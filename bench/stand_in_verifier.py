@@ -0,0 +1,56 @@
+import argparse
+from pathlib import Path
+import sys
+import time
+
+
+def count_constraints(formula_path):
+    with Path(formula_path).open() as f:
+        return sum(1 for line in f if line.strip() and not line.startswith(('*', 'min:')))
+
+
+def main(args):
+    n_constraints = count_constraints(args.formula_path)
+    with open(args.proof_path) as f:
+        header = f.readline().strip()
+        if not header.startswith('pseudo-Boolean proof version'):
+            sys.exit(f'Bad proof header {header!r}')
+        n_lines = 1
+        if not header.endswith(' 2.0'):
+            # Version 2.0 has no f line
+            n_lines, counter = 2, f.readline().split()
+            if counter[:1] != ['f'] or int(counter[1]) != n_constraints:
+                sys.exit(f'Proof expects {counter[1:2]} formula constraints but there are {n_constraints}')
+        last = None
+        for n_lines, line in enumerate(f, start=n_lines + 1):
+            if args.stop_after is not None and n_lines > args.stop_after:
+                sys.exit(f'Stopped reading after {args.stop_after} lines')
+            if args.delay:
+                time.sleep(args.delay)
+            if line.strip():
+                last = line.split()[0]
+    if last not in ['end', 'c']:
+        sys.exit('Proof ends without a conclusion or contradiction')
+    print(f'Read {n_lines} proof lines')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Stand-in for a proof checker when trying out run.py --verify. "
+                    "It only checks the proof header, the formula constraint count and "
+                    "that the proof is finished, and exits non-zero otherwise"
+    )
+    parser.add_argument(
+        "formula_path", help="Formula (.opb) path"
+    )
+    parser.add_argument(
+        "proof_path", help="Proof path, such as /dev/stdin"
+    )
+    parser.add_argument(
+        "--delay", type=float, required=False, default=0.0, help="Seconds to wait per proof line, to act as a slow checker"
+    )
+    parser.add_argument(
+        "--stop-after", type=int, required=False, help="Fail after reading this many proof lines"
+    )
+    args = parser.parse_args()
+    main(args)
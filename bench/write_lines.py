@@ -0,0 +1,48 @@
+import argparse
+from pathlib import Path
+import sys
+import tempfile
+import time
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from prooflog import ProofWriter
+
+
+LINE = ('red', '37 x[12][40]', '-5 x[3][12]', '75 ~d[40]', '>=', '12', ';', 'd[40] -> 1')
+
+
+def append_per_line(path, n_lines):
+    for _ in range(n_lines):
+        with path.open('a') as f:
+            f.write(' '.join(LINE) + '\n')
+
+
+def buffered(path, n_lines):
+    with ProofWriter(path) as writer:
+        for _ in range(n_lines):
+            writer.write_line(*LINE)
+
+
+def main(args):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, fn in [('append-per-line', append_per_line), ('buffered', buffered)]:
+            path = Path(tmp_dir) / f'{name}.veripb'
+            start = time.perf_counter()
+            fn(path, args.lines)
+            elapsed = time.perf_counter() - start
+            print(f'{name:>16}: {args.lines / elapsed:12.0f} lines/s ({elapsed:.3f}s)')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Compare proof line throughput of per-line appends and ProofWriter"
+    )
+    parser.add_argument(
+        "--lines",
+        type=int,
+        required=False,
+        default=200_000,
+        help="Number of proof lines to write",
+    )
+    args = parser.parse_args()
+    main(args)
@@ -1,6 +1,13 @@
 import argparse
+from bisect import bisect_right
+from itertools import accumulate
+from operator import itemgetter
 from pathlib import Path
 import random
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from prooflog import write_instance, write_text_instance
 
 
 def percentage(x):
@@ -12,29 +19,41 @@ def percentage(x):
     return x
 
 
-def sample(n_edges, args, out_file):
+def sample(n_edges, args):
     edge_proba = 0.01 * args.edge_probability_pct
     n_vertices = int((2 * n_edges / edge_proba) ** 0.5)
-    out_file.write(f'{n_vertices}\n')
-    edges = random.sample([(from_ix, to_ix)
-                           for from_ix in range(n_vertices)
-                           for to_ix in range(from_ix + 1, n_vertices)], n_edges)
-    for from_ix, to_ix in edges:
-        weight = random.randint(args.min_weight, args.max_weight)
-        out_file.write(f'{from_ix} {to_ix} {weight}\n')
+    # Pairs from_ix < to_ix are numbered row by row, so rather than listing
+    # them all we sample their indices and look up the row of each one;
+    # this draws exactly the edges that sampling the list itself would
+    row_start = list(accumulate(range(n_vertices - 1, 0, -1), initial=0))
+    pairs = random.sample(range(row_start[-1]), n_edges)
+    return n_vertices, sample_edges(pairs, row_start, args)
+
+
+def sample_edges(pairs, row_start, args):
+    # Weights are drawn lazily, as the edges are written
+    randint = random.randint
+    for pair in pairs:
+        from_ix = bisect_right(row_start, pair) - 1
+        yield from_ix, from_ix + 1 + pair - row_start[from_ix], randint(args.min_weight, args.max_weight)
 
 
 def main(args):
     out_dir = Path(args.output_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
     max_len = len(str(args.num_samples))
+    extension = args.extension or ('bin' if args.binary else 'txt')
     for ix in range(1, args.num_samples + 1):
         n_edges = args.min_size + int((ix - 1) * (args.max_size - args.min_size) / (args.num_samples - 1))
-        file_name = f'{args.prefix}_{ix:0{max_len}}_{n_edges}.{args.extension}'
+        file_name = f'{args.prefix}_{ix:0{max_len}}_{n_edges}.{extension}'
         out_path = out_dir / file_name
-        with out_path.open('w') as out_file:
-            sample(n_edges, args, out_file)
-            
+        n_vertices, edges = sample(n_edges, args)
+        if args.binary:
+            # Binary instances keep edges in the order the text parser gives
+            write_instance(out_path, 'dag', n_vertices, sorted(edges, key=itemgetter(0)))
+        else:
+            write_text_instance(out_path, n_vertices, edges)
+
 
 
 if __name__ == "__main__":
@@ -56,8 +75,12 @@ if __name__ == "__main__":
     parser.add_argument(
         "--extension",
         required=False,
-        default='txt',
-        help="Filename extension",
+        help="Filename extension, txt or bin by default",
+    )
+    parser.add_argument(
+        "--binary",
+        action='store_true',
+        help="Write instances in the binary format of prooflog.instances",
     )
     parser.add_argument(
         "--num-samples",
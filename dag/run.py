@@ -1,26 +1,265 @@
 import argparse
-from functools import cache
+from array import array
+from functools import partial
 from pathlib import Path
+import sys
+import tempfile
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from prooflog import ProofWriter, TermTable, accumulate, is_binary_instance, open_output, output_paths, phase, read_instance, tight_big_m
+from prooflog.incremental import ProofState
+from prooflog.parallel import render_parallel
+from prooflog.runners import add_arguments, prepare_dirs, report, run_main, with_stats
 
-class ProofManager:
-    def __init__(self, n_vertices, edges, flow_cons, target_path):
-        self.target_path = target_path
+
+class Graph:
+    """Edge list of a parsed instance, indexed by endpoint.
+
+    ``edges`` is any sequence of (source, target, weight) ordered by source,
+    such as a list from a text instance or the mapped rows of a binary one.
+    Every edge goes from a lower to a higher vertex, as parse_instance
+    checks, so increasing order is a topological order.
+
+    The incoming and outgoing edges of every vertex are stored in
+    compressed sparse row form: the neighbours of vertex v are
+    ``in_vertex[in_start[v]:in_start[v + 1]]``, with matching weights in
+    ``in_weight``, and likewise for ``out_*``. Both keep the order of
+    ``edges``.
+    """
+
+    def __init__(self, n_vertices, edges):
         self.n_vertices = n_vertices
         self.edges = edges
-        self.big_m = 2 * sum(abs(w) for _, _, w in self.edges)
+        self.in_start, self.in_vertex, self.in_weight = self.index(1, 0)
+        self.out_start, self.out_vertex, self.out_weight = self.index(0, 1)
+
+
+    def index(self, key, other):
+        start = array('q', bytes(8 * (self.n_vertices + 1)))
+        for e in self.edges:
+            start[e[key] + 1] += 1
+        for v in range(self.n_vertices):
+            start[v + 1] += start[v]
+        fill = start[:-1]
+        vertex = array('q', bytes(8 * len(self.edges)))
+        weight = array('q', bytes(8 * len(self.edges)))
+        for e in self.edges:
+            pos = fill[e[key]]
+            vertex[pos] = e[other]
+            weight[pos] = e[2]
+            fill[e[key]] = pos + 1
+        return start, vertex, weight
+
+
+    def incoming(self, v):
+        lo, hi = self.in_start[v], self.in_start[v + 1]
+        return zip(self.in_vertex[lo:hi], self.in_weight[lo:hi])
+
+
+    def outgoing(self, u):
+        lo, hi = self.out_start[u], self.out_start[u + 1]
+        return zip(self.out_vertex[lo:hi], self.out_weight[lo:hi])
+
+
+    def descendants(self, source):
+        return self.reachable(source, self.out_start, self.out_vertex)
+
+
+    def ancestors(self, target):
+        return self.reachable(target, self.in_start, self.in_vertex)
+
+
+    def reachable(self, source, start, vertex):
+        # Flags for the vertices reached from source along the given rows
+        seen = bytearray(self.n_vertices)
+        seen[source] = 1
+        stack = [source]
+        while stack:
+            u = stack.pop()
+            for v in vertex[start[u]:start[u + 1]]:
+                if not seen[v]:
+                    seen[v] = 1
+                    stack.append(v)
+        return seen
+
+
+    def ancestor_order(self, target):
+        # Ancestors of target in depth-first post-order over incoming edges,
+        # so every vertex comes after all of the vertices it depends on
+        order = list()
+        seen = bytearray(self.n_vertices)
+        seen[target] = 1
+        stack = [(target, self.incoming(target))]
+        while stack:
+            v, vertices_in = stack[-1]
+            for u, _ in vertices_in:
+                if not seen[u]:
+                    seen[u] = 1
+                    stack.append((u, self.incoming(u)))
+                    break
+            else:
+                stack.pop()
+                order.append(v)
+        return order
+
+
+
+class ProofManager:
+    def __init__(self, graph, flow_cons, target_path, compress='none', prefix_sums=False, stats=None, verifier=None,
+                 previous=None, keep_state=False, workers=1, prune=False):
+        self.target_path = target_path
+        self.prefix_sums = prefix_sums
+        self.stats = stats
+        self.workers = workers
+        self.prune = prune
+        # Blocks of an earlier proof that may be copied, and whether to
+        # record this proof's blocks for later runs
+        self.previous = previous
+        self.graph = graph
+        self.n_vertices = graph.n_vertices
+        self.edges = graph.edges
         self.flow_cons = flow_cons
+        self.terms = TermTable([w for _, _, w in self.edges], [f'x[{u}][{v}]' for u, v, _ in self.edges])
         self.at_most_ones = dict()
-        self.counter = max(flow_cons.values())
+        # DP state per vertex: shortest distance from 0 (None if unreachable)
+        # and the previous vertex on that path, both found by shortest_paths
+        # before any proof is written, and the ID of the justified bound
+        self.dist = None
+        self.parent = None
+        self.bounds = [None] * self.n_vertices
+        # When pruning, flags for the vertices on some path from 0 to the last
+        # vertex, the (index, target) of the edges between them, and pol terms
+        # adding the other edges back onto the objective bound
+        self.relevant = None
+        self.kept_edges = None
+        self.pruned_terms = list()
+        self.state = ProofState('dag', list(self.edges)) if keep_state else None
+        self.writer = ProofWriter(target_path, max(flow_cons.values()), compress, stats=stats, verifier=verifier)
         self.write_line('pseudo-Boolean proof version 1.2', is_constraint=False)
-        self.write_line(f'f {self.counter} 0', is_constraint=False)
+        self.write_line(f'f {self.writer.counter} 0', is_constraint=False)
 
 
     def run(self):
-        self.derive_at_most_ones()
-        score, path, bound = self.generate_proof(self.n_vertices - 1)
-        remove_big_m = self.write_line('rup', f'1 d[{self.n_vertices - 1}]', '>= 1', ';')
-        final_bound = self.write_line('pol', f'{bound} 1 *', f'{remove_big_m} {self.big_m} *', '+')
+        target = self.n_vertices - 1
+        # The linear proof needs potentials for every vertex, while the DP
+        # proof only covers the vertices that the last one depends on
+        order = range(self.n_vertices) if self.prefix_sums else self.graph.ancestor_order(target)
+        if self.prune:
+            with phase(self.stats, 'reachability'):
+                reached, reaching = self.graph.descendants(0), self.graph.ancestors(target)
+            if reached[target]:
+                self.relevant = bytes(a & b for a, b in zip(reached, reaching))
+                self.kept_edges = [(ix, v) for ix, (u, v, _) in enumerate(self.edges) if self.relevant[u] and self.relevant[v]]
+                order = [v for v in order if self.relevant[v]]
+        with phase(self.stats, 'solve'):
+            self.dist, self.parent = shortest_paths(self.graph, order)
+        with self.writer:
+            if self.prefix_sums:
+                with phase(self.stats, 'derive_prefix_bounds'):
+                    score, final_bound = self.derive_prefix_bounds()
+            else:
+                if self.relevant is not None:
+                    with phase(self.stats, 'fix_pruned_edges'):
+                        self.fix_pruned_edges(reached, reaching)
+                with phase(self.stats, 'derive_at_most_ones'):
+                    self.derive_at_most_ones()
+                with phase(self.stats, 'generate_proof'):
+                    if self.workers > 1:
+                        # A block repeats the objective over the edges into
+                        # vertices up to its target for every edge into it
+                        bounds = render_parallel(
+                            self.writer, lambda writer, lo, hi: self.render_vertices(writer, order[lo:hi]),
+                            [self.n_constraints(target) for target in order],
+                            [self.graph.in_start[target + 1] * (self.graph.in_start[target + 1] - self.graph.in_start[target] + 2) + 1
+                             for target in order],
+                            self.workers,
+                        )
+                        for target, bound in zip(order, bounds):
+                            self.bounds[target] = bound
+                    else:
+                        reusable = self.reusable_vertices()
+                        for target in order:
+                            self.justify_vertex(target, reusable)
+                    score = self.dist[target]
+                    final_bound = self.objective_bound(target, self.pruned_terms)
+                if self.stats is not None:
+                    # Each vertex other than 0 asks for the bound of every predecessor
+                    self.stats.record_memo(1 + sum(self.graph.in_start[v + 1] - self.graph.in_start[v] for v in order if v != 0), len(order))
+            with phase(self.stats, 'conclusion'):
+                self.conclude(target, score, final_bound)
+        return score
+
+
+    def run_targets(self, proof_paths, compress='none'):
+        """Writes a proof for each target vertex in proof_paths, returning the optima.
+
+        The blocks of every vertex are written to this manager's proof once,
+        in vertex order, and the proof for a target copies them up to the end
+        of its own block before concluding. The shared proof is not an output,
+        so only the copies count towards the stats. A target's block only
+        depends on the vertices before it, as increasing order is
+        topological.
+        """
+        order = range(self.n_vertices)
+        with phase(self.stats, 'solve'):
+            self.dist, self.parent = shortest_paths(self.graph, order)
+        ends = [None] * self.n_vertices
+        shared = self.writer
+        shared.stats = None
+        with shared:
+            with phase(self.stats, 'derive_at_most_ones'):
+                self.derive_at_most_ones()
+            with phase(self.stats, 'generate_proof'):
+                for target in order:
+                    self.generate_proof(target)
+                    ends[target] = (shared.tell(), shared.counter)
+        optima = dict()
+        with phase(self.stats, 'write_targets'):
+            for target, proof_path in proof_paths.items():
+                end, counter = ends[target]
+                with ProofWriter(proof_path, 0, compress, stats=self.stats) as self.writer:
+                    self.writer.append_file(shared.path, counter, end)
+                    score = self.dist[target]
+                    final_bound = self.objective_bound(target, self.fix_later_edges(target) if score is not None else [])
+                    self.conclude(target, score, final_bound)
+                optima[target] = score
+        self.writer = shared
+        return optima
+
+
+    def objective_bound(self, target, extra_terms):
+        # The bound for target without its big-M term, plus any terms that
+        # make it a bound on the whole objective
+        big_m = 1
+        if self.dist[target] is not None:
+            big_m = tight_big_m(self.dist[target], self.terms.select_range(self.in_prefix(target))[0])
+        remove_big_m = self.write_line('rup', f'1 d[{target}]', '>= 1', ';')
+        return self.write_line('pol', f'{self.bounds[target]} 1 *', f'{remove_big_m} {big_m} *', '+',
+                               *[f'{term} +' for term in extra_terms])
+
+
+    def fix_later_edges(self, target):
+        # Pol terms adding w x >= 0 for every edge into a vertex after target.
+        # If target is the sink no flow enters the later vertices, by the sum
+        # of their flow constraints, and then none leaves any of them in turn,
+        # so when some of these edges are negative they are all fixed to 0.
+        # No path to target uses these edges, as the order is topological.
+        later = [(u, v, w) for u, v, w in self.edges if v > target]
+        if all(w >= 0 for _, _, w in later):
+            return [f'x[{u}][{v}] {w} *' for u, v, w in later if w > 0]
+        terms = list()
+        for u, v, w in later:
+            fixed = self.write_line('rup', f'1 ~x[{u}][{v}]', '>= 1', ';')
+            if w > 0:
+                terms.append(f'x[{u}][{v}] {w} *')
+            elif w < 0:
+                terms.append(f'{fixed} {-w} *')
+        self.write_line(f'* Fixed the {len(later)} edges into vertices after {target}', is_constraint=False)
+        return terms
+
+
+    def conclude(self, target, score, final_bound):
+        path = self.best_path(target)
         if score is not None:
             self.write_line('output NONE', is_constraint=False)
             self.write_line(f'conclusion BOUNDS {score} : {final_bound} {score} : ' +
@@ -31,74 +270,215 @@ class ProofManager:
             self.write_line('c', f'{contradiction}')
 
 
-    @cache
+    def best_path(self, target):
+        path = set()
+        while self.dist[target] is not None and target != 0:
+            path.add((self.parent[target], target))
+            target = self.parent[target]
+        return path
+
+
+    def reusable_vertices(self):
+        # The block for a vertex depends only on the edges into it and into
+        # earlier vertices, so vertices before the first changed edge target
+        # can be copied from the previous proof
+        if self.previous is None:
+            return 0
+        old = self.previous.state
+        changed = set(old.rows).symmetric_difference(self.edges)
+        reusable = min((v for _, v, _ in changed), default=self.n_vertices)
+        if [e for e in old.rows if e[1] < reusable] != [e for e in self.edges if e[1] < reusable]:
+            # The same edges, but listed in another order
+            return 0
+        return reusable
+
+
+    def justify_vertex(self, target, reusable):
+        if self.state is not None:
+            start, base = self.writer.tell(), self.writer.counter
+        if target < reusable and target in self.previous.state.blocks:
+            shift, (_, _, bound) = self.previous.copy(target, self.writer)
+            self.bounds[target] = bound + shift if bound is not None else None
+        else:
+            self.generate_proof(target)
+        if self.state is not None:
+            self.state.record(target, start, self.writer.tell(), base, self.writer.counter - base,
+                              (self.dist[target], self.parent[target], self.bounds[target]))
+
+
+    def n_constraints(self, target):
+        # How many constraints generate_proof derives for target
+        if target == 0:
+            return 0
+        if self.dist[target] is None:
+            return 1
+        vertices_in = dict(self.incoming(target))
+        return 3 * len(vertices_in) - (0 in vertices_in) + 4
+
+
+    def incoming(self, target):
+        # The edges into target that the proof covers
+        if self.relevant is None:
+            return self.graph.incoming(target)
+        return [(u, w) for u, w in self.graph.incoming(target) if self.relevant[u]]
+
+
+    def in_prefix(self, target):
+        # The indices of the edges into vertices up to target that the proof covers
+        if self.kept_edges is None:
+            return [ix for ix, (_, v, _) in enumerate(self.edges) if v <= target]
+        return [ix for ix, v in self.kept_edges if v <= target]
+
+
+    def render_vertices(self, writer, targets):
+        # Runs in a worker process, which writes its blocks on its own
+        self.writer = writer
+        for target in targets:
+            self.generate_proof(target)
+        return [self.bounds[target] for target in targets]
+
+
     def generate_proof(self, target):
         if target == 0:
-            return 0, list(), None
-        vertices_in = {
-            u: w
-            for (u, v, w) in self.edges
-            if v == target
-        }
-        inbounds = {v: self.generate_proof(v) for v in vertices_in}
-        dist, path = None, None
-        for v, (dist_v, path_v, _) in inbounds.items():
-            if dist_v is not None:
-                total_dist_v = dist_v + vertices_in[v]
-                if dist is None or total_dist_v < dist:
-                    dist, path = total_dist_v, path_v + [(v, target)]
+            return
+        inbounds = dict(self.incoming(target))
+        dist = self.dist[target]
         bound = None
         if dist is None:
             bound = self.write_line('rup', f'1 ~d[{target}]', '>= 1', ';')
         else:
+            # The objective restricted to edges into vertices up to target,
+            # and big-M coefficients just large enough to satisfy the bounds
+            # on it and on its negation
+            in_prefix = self.in_prefix(target)
+            objective = self.terms.select(in_prefix)
+            low, high = self.terms.select_range(in_prefix)
+            big_m, big_m_neg = tight_big_m(dist, low), tight_big_m(1 - dist, -high)
             edge_bounds = dict()
             for v in inbounds:
                 if v > 0:
                     self.write_line('rup', f'1 ~d[{target}]', f'1 ~x[{v}][{target}]', f'1 d[{v}]', '>= 1', ';')
                 edge_bounds[v] = self.write_line(
                     'red',
-                    f'{self.big_m} ~d[{target}]',
-                    f'{self.big_m} ~x[{v}][{target}]',
-                    *[f'{w} x[{u}][{v}]'for u, v, w in self.edges if v <= target],
+                    f'{big_m} ~d[{target}]',
+                    f'{big_m} ~x[{v}][{target}]',
+                    *objective,
                     '>=', f'{dist}', ';',
                     f'd[{target}] -> 1', f'x[{v}][{target}] -> 1',
                 )
         
             bound_pos = self.write_line(
                 'red',
-                f'{self.big_m} ~q[{target}]',
-                *[f'{w} x[{u}][{v}]'for u, v, w in self.edges if v <= target],
+                f'{big_m} ~q[{target}]',
+                *objective,
                 '>=', f'{dist}', ';',
                 f'q[{target}] -> 0',
             )
             bound_neg = self.write_line(
                 'red',
-                f'{self.big_m} q[{target}]',
-                *[f'{-w} x[{u}][{v}]'for u, v, w in self.edges if v <= target],
+                f'{big_m_neg} q[{target}]',
+                *self.terms.select(in_prefix, negated=True),
                 '>=', f'{1 - dist}', ';',
                 f'q[{target}] -> 1',
             )
             for v, edge_bound in edge_bounds.items():
                 self.write_line('pol', f'{bound_neg} 1 *', f'{edge_bound} 1 *', '+')
             impl = self.write_line('rup', f'1 ~d[{target}]', f'1 q[{target}]', '>= 1', ';')
-            bound = self.write_line('pol', f'{impl} {self.big_m} *', f'{bound_pos} 1 *', '+')
+            bound = self.write_line('pol', f'{impl} {big_m} *', f'{bound_pos} 1 *', '+')
         self.write_line(f'* Justified the bound {dist} for path segment to {target}', is_constraint=False)
-        return dist, path, bound
+        self.bounds[target] = bound
+
+
+    def potentials(self):
+        # Shortest distances from 0 for the vertices it reaches, then values for
+        # the other vertices chosen so that no edge has a negative reduced
+        # cost w + pi[u] - pi[v], going backwards in topological order.
+        pi = list(self.dist)
+        reached = [d is not None for d in pi]
+        for u in range(self.n_vertices - 1, -1, -1):
+            if pi[u] is None:
+                pi[u] = max((pi[v] - w for v, w in self.graph.outgoing(u)), default=0)
+        return pi, reached
+
+
+    def derive_prefix_bounds(self):
+        # Sum the flow constraints weighted by the potentials, one vertex at a
+        # time, adding each incoming edge at its reduced cost. After vertex t
+        # the running constraint bounds the cost of the edges into 0..t by the
+        # potentials of the edges leaving that prefix, and after the last
+        # vertex it is the objective bound. If the last vertex is unreachable,
+        # summing the flow constraints of the reachable vertices instead gives
+        # a contradiction.
+        pi, reached = self.potentials()
+        target = self.n_vertices - 1
+        bound = None
+        for v in range(self.n_vertices):
+            terms = list()
+            if reached[target]:
+                if pi[v] > 0:
+                    terms.append(f'{self.flow_cons[(v, "<=")]} {pi[v]} *')
+                elif pi[v] < 0:
+                    terms.append(f'{self.flow_cons[(v, ">=")]} {-pi[v]} *')
+                terms.extend(
+                    f'x[{u}][{v}] {w + pi[u] - pi[v]} *'
+                    for u, w in self.graph.incoming(v)
+                    if w + pi[u] - pi[v] > 0
+                )
+            elif reached[v] and bound is None:
+                bound = self.flow_cons[(v, '>=')]
+            elif reached[v]:
+                terms.append(f'{self.flow_cons[(v, ">=")]}')
+            if terms:
+                bound = self.write_line('pol', *accumulate(bound, terms))
+                self.write_line(f'* Prefix bound up to vertex {v}', is_constraint=False)
+        if bound is None:
+            # Every weight and potential is zero, and so is the objective
+            bound = self.write_line('rup', *self.terms.prefix(len(self.edges)), '>= 0', ';')
+        return (pi[target] if reached[target] else None), bound
+
+
+    def fix_pruned_edges(self, reached, reaching):
+        # No flow can use an edge that is not on a path from 0 to the last
+        # vertex. Going forwards, every edge into a vertex that 0 does not
+        # reach is already fixed to 0, so by its flow constraint neither can
+        # an edge out of it be taken. Going backwards, the same holds for the
+        # edges into a vertex that does not reach the last one. Each sweep
+        # comes to a vertex after every vertex it depends on, as increasing
+        # order is topological.
+        for u in range(self.n_vertices):
+            if not reached[u]:
+                for v, w in self.graph.outgoing(u):
+                    self.fix_edge(u, v, w)
+        for v in range(self.n_vertices - 1, -1, -1):
+            if reached[v] and not reaching[v]:
+                for u, w in self.graph.incoming(v):
+                    if reached[u]:
+                        self.fix_edge(u, v, w)
+        self.write_line(f'* Fixed {len(self.edges) - len(self.kept_edges)} edges off every path to {self.n_vertices - 1}', is_constraint=False)
+
+
+    def fix_edge(self, u, v, w):
+        fixed = self.write_line('rup', f'1 ~x[{u}][{v}]', '>= 1', ';')
+        # The bounds leave this edge out of the objective, so the final one
+        # adds w x >= 0 back, from the fixed edge when w is negative
+        if w > 0:
+            self.pruned_terms.append(f'x[{u}][{v}] {w} *')
+        elif w < 0:
+            self.pruned_terms.append(f'{fixed} {-w} *')
 
 
     def derive_at_most_ones(self):
-        cum_sum = list()
+        cum_sum = None
         for target in range(self.n_vertices - 1, -1, -1):
-            # Show that for any vertex there is at most one incoming edge
-            cum_sum.append(f'{self.flow_cons[(target, ">=")]} 1 *')
-            if len(cum_sum) > 1:
-                cum_sum.append('+')
-            vertices_in = [
-                u
-                for (u, v, _) in self.edges
-                if v == target
-            ]
-            self.at_most_ones[target] = self.write_line('pol', *cum_sum)
+            if self.relevant is not None and not self.relevant[target]:
+                continue
+            # Show that for any vertex there is at most one incoming edge.
+            # The sum of the flow constraints of target and every later
+            # vertex is the previous sum plus one constraint.
+            flow = f'{self.flow_cons[(target, ">=")]} 1 *'
+            cum_sum = self.write_line('pol', *([flow] if cum_sum is None else [f'{cum_sum}', flow, '+']))
+            self.at_most_ones[target] = cum_sum
+            vertices_in = [u for u, _ in self.incoming(target)]
             # Introduce d[v] := v has an incoming edge
             self.write_line(
                 'red',
@@ -126,97 +506,199 @@ class ProofManager:
 
 
     def write_line(self, *line, is_constraint=True):
-        with self.target_path.open('a') as f:
-            f.write(' '.join(line) + '\n')
-        if is_constraint:
-            self.counter += 1
-            return self.counter
+        return self.writer.write_line(*line, is_constraint=is_constraint)
 
 
 
+def shortest_paths(graph, order):
+    """Shortest distances from vertex 0 and the previous vertex on each path.
+
+    Vertices are relaxed in the given order, which must put every vertex
+    after its predecessors, by taking the best of the edges into it. The
+    distance is None for vertices that are not reached or not in order, and
+    ties keep the first edge in the order of ``graph.edges``.
+    """
+    dist = [None] * graph.n_vertices
+    parent = array('q', [-1]) * graph.n_vertices
+    in_start, in_vertex, in_weight = graph.in_start, graph.in_vertex, graph.in_weight
+    for v in order:
+        if v == 0:
+            dist[v] = 0
+            continue
+        best = None
+        for ix in range(in_start[v], in_start[v + 1]):
+            d = dist[in_vertex[ix]]
+            if d is not None and (best is None or d + in_weight[ix] < best):
+                best = d + in_weight[ix]
+                parent[v] = in_vertex[ix]
+        dist[v] = best
+    return dist, parent
+
+
 def parse_instance(path):
-    with path.open() as f:
-        n_vertices = int(f.readline().strip())
-        g = [dict() for _ in range(n_vertices)]
-        for line in f:
-            f, t, w = [int(x) for x in line.strip().split()]
-            g[f][t] = w
-    return g
-
-
-def generate_formula(g, path):
-    edges = [
-        (source, target, weight)
-        for source, out_edges in enumerate(g)    
-        for target, weight in out_edges.items()
-    ]
+    # Number of vertices and the (source, target, weight) edges ordered by
+    # source. The proofs take the vertices in increasing order, so every edge
+    # must go from a lower to a higher vertex.
+    if is_binary_instance(path):
+        n_vertices, edges = read_instance(path, 'dag')
+    else:
+        with path.open() as f:
+            n_vertices = int(f.readline().strip())
+            g = [dict() for _ in range(n_vertices)]
+            for line in f:
+                f, t, w = [int(x) for x in line.strip().split()]
+                g[f][t] = w
+        edges = [
+            (source, target, weight)
+            for source, out_edges in enumerate(g)
+            for target, weight in out_edges.items()
+        ]
+    for source, target, _ in edges:
+        if not 0 <= source < target < n_vertices:
+            raise ValueError(f'Edge from {source} to {target} is not between vertices u < v of 0..{n_vertices - 1}')
+    return n_vertices, edges
+
+
+def flow_sides(graph):
+    # The left-hand sides of the two flow constraints of every vertex, which
+    # do not depend on where the path ends
+    for ix in range(graph.n_vertices):
+        in_edge_list = [u for u, _ in graph.incoming(ix)]
+        out_edge_list = [v for v, _ in graph.outgoing(ix)]
+        yield (
+            ' '.join([
+                ' '.join(
+                    f'-1 x[{u}][{ix}]'
+                    for u in in_edge_list
+                ),
+                ' '.join(
+                    f'1 x[{ix}][{v}]'
+                    for v in out_edge_list
+                ),
+            ]),
+            ' '.join([
+                ' '.join(
+                    f'1 x[{u}][{ix}]'
+                    for u in in_edge_list
+                ),
+                ' '.join(
+                    f'-1 x[{ix}][{v}]'
+                    for v in out_edge_list
+                ),
+            ]),
+        )
+
+
+def generate_formula(graph, path, compress='none', sink=None, sides=None):
+    # A unit of flow from 0 to sink, by default the last vertex. Formulas for
+    # several sinks can share the sides of the flow constraints.
+    sink = graph.n_vertices - 1 if sink is None else sink
     flow_cons = dict()
     cnt = 1
-    with path.open('w') as f:
-        f.write(' '.join(['min:', *[f'{w} x[{u}][{v}]' for u, v, w in edges]]) + '\n')
-        for ix in range(len(g)):
-            bal = +1 if ix == 0 else -1 if ix == len(g) - 1 else 0
-            in_edge_list = [
-                e
-                for e in edges
-                if e[1] == ix
-            ]
-            out_edge_list = [
-                e
-                for e in edges
-                if e[0] == ix
-            ]
-            f.write(
-                ' '.join([
-                    ' '.join(
-                        f'-1 x[{u}][{v}]'
-                        for u, v, _ in in_edge_list
-                    ),
-                    ' '.join(
-                        f'1 x[{u}][{v}]'
-                        for u, v, _ in out_edge_list
-                    ),
-                    f'>= {bal};'
-                ]) + '\n'
-            )
+    with open_output(path, compress) as f:
+        f.write(' '.join(['min:', *[f'{w} x[{u}][{v}]' for u, v, w in graph.edges]]) + '\n')
+        for ix, (out_minus_in, in_minus_out) in enumerate(flow_sides(graph) if sides is None else sides):
+            bal = +1 if ix == 0 else -1 if ix == sink else 0
+            f.write(f'{out_minus_in} >= {bal};\n')
             flow_cons[(ix, '>=')] = cnt
             cnt += 1
-            f.write(
-                ' '.join([
-                    ' '.join(
-                        f'1 x[{u}][{v}]'
-                        for u, v, _ in in_edge_list
-                    ),
-                    ' '.join(
-                        f'-1 x[{u}][{v}]'
-                        for u, v, _ in out_edge_list
-                    ),
-                    f'>= {-bal};'
-                ]) + '\n'
-            )
+            f.write(f'{in_minus_out} >= {-bal};\n')
             flow_cons[(ix, '<=')] = cnt
             cnt += 1
-    return edges, flow_cons
+    return flow_cons
+
 
+def solve(instance_path, stats=None):
+    # The optimum alone, without writing a formula or proof
+    with phase(stats, 'parse_instance'):
+        graph = Graph(*parse_instance(instance_path))
+    with phase(stats, 'solve'):
+        target = graph.n_vertices - 1
+        dist, parent = shortest_paths(graph, graph.ancestor_order(target))
+    path = None
+    if dist[target] is not None:
+        path = [target]
+        while path[-1] != 0:
+            path.append(parent[path[-1]])
+        path.reverse()
+    return {'size': len(graph.edges), 'optimum': dist[target], 'path': path}
 
-def prepare_dirs(formula_path, proof_path):
-    formula_path.unlink(missing_ok=True)
-    proof_path.unlink(missing_ok=True)
 
+def parse_targets(text):
+    # "all", or comma separated vertices
+    return text if text == 'all' else [int(t) for t in text.split(',')]
 
-def main(instance_path):
-    formula_path = instance_path.with_suffix('.opb')
-    proof_path = instance_path.with_suffix('.veripb')
-    prepare_dirs(formula_path, proof_path)
-    g = parse_instance(instance_path)
-    edges, flow_cons = generate_formula(g, formula_path)
-    ProofManager(len(g), edges, flow_cons, proof_path).run()
+
+def target_paths(instance_path, target, compress='none'):
+    # The formula and proof for paths from 0 to target
+    return output_paths(instance_path.with_stem(f'{instance_path.stem}_to_{target}'), compress)
+
+
+def prove_targets(instance_path, targets, compress='none', stats=None):
+    # One formula and proof per target. The formulas share the sides of their
+    # flow constraints, and the proofs everything up to the target's block.
+    with phase(stats, 'parse_instance'):
+        graph = Graph(*parse_instance(instance_path))
+    targets = range(1, graph.n_vertices) if targets == 'all' else targets
+    for target in targets:
+        if not 0 < target < graph.n_vertices:
+            raise ValueError(f'Target {target} is not a vertex after 0')
+    paths = {target: target_paths(instance_path, target, compress) for target in targets}
+    for formula_path, proof_path in paths.values():
+        prepare_dirs(formula_path, proof_path)
+    with phase(stats, 'generate_formula'):
+        sides = list(flow_sides(graph))
+        for target, (formula_path, _) in paths.items():
+            flow_cons = generate_formula(graph, formula_path, compress, target, sides)
+    with tempfile.TemporaryDirectory(dir=instance_path.parent) as tmp_dir:
+        manager = ProofManager(graph, flow_cons, Path(tmp_dir) / 'shared.veripb', stats=stats)
+        optima = manager.run_targets({target: proof_path for target, (_, proof_path) in paths.items()}, compress)
+    if stats is not None:
+        stats.record_outputs(*[path for pair in paths.values() for path in pair])
+    return {'size': len(graph.edges), 'optima': optima}
+
+
+def main(instance_path, *, compress='none', prefix_sums=False, stats_path=None, incremental=False, workers=1, prune=False,
+         targets=None, **options):
+    """Writes the formula and proof for an instance, or with targets one of each per target, and returns a summary.
+
+    The other options are those of prooflog.runners.run_main.
+    """
+    if targets is not None and not options.get('solve_only'):
+        if prefix_sums or incremental or workers > 1 or prune or options.get('verify') is not None or options.get('cache_dir') is not None:
+            raise ValueError('Proofs for several targets must be unpruned dynamic programming proofs, written to disk by one process without a cache')
+        return with_stats(stats_path, partial(prove_targets, instance_path, targets, compress))
+    if incremental and (prefix_sums or workers > 1 or prune):
+        raise ValueError('Incremental proofs must be unpruned dynamic programming proofs written by one process')
+    if workers > 1 and prefix_sums:
+        raise ValueError('Only dynamic programming proofs can be written by several workers')
+    if prune and prefix_sums:
+        raise ValueError('Only dynamic programming proofs can be pruned')
+
+    def write(formula_path, proof_path, stats, verifier, previous):
+        with phase(stats, 'parse_instance'):
+            graph = Graph(*parse_instance(instance_path))
+        with phase(stats, 'generate_formula'):
+            flow_cons = generate_formula(graph, formula_path, compress)
+        return len(graph.edges), ProofManager(
+            graph, flow_cons, proof_path, compress, prefix_sums, stats, verifier, previous, incremental, workers, prune
+        )
+
+    return run_main('dag', instance_path, solve, write, [prefix_sums, prune], compress=compress, stats_path=stats_path,
+                    incremental=incremental, **options)
     
     
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
+    add_arguments(parser, 'the shortest path')
+    parser.add_argument(
+        '--prune', action='store_true',
+        help='Fix the edges on no path from the first vertex to the last one to 0 up front, and leave them out of the dynamic programming proof'
+    )
     parser.add_argument(
-        'instance_path', help='Instance path'
+        '--targets', metavar='LIST', type=parse_targets,
+        help='Write a formula and proof for paths to each of these comma separated vertices, or to every vertex with "all", '
+             'next to the instance as NAME_to_TARGET.opb and .veripb'
     )
     args = parser.parse_args()
-    main(Path(args.instance_path))
\ No newline at end of file
+    report(args, main(**vars(args)))
@@ -2,29 +2,39 @@ import argparse
 from math import ceil
 from pathlib import Path
 import random
+import sys
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from prooflog import write_instance, write_text_instance
 
-def sample(n_ints, args, out_file):
+
+def sample(n_ints, args):
     max_time = random.randint(args.min_time, args.max_time)
-    out_file.write(f'{n_ints}\n')
+    return sample_intervals(n_ints, max_time, args)
+
+
+def sample_intervals(n_ints, max_time, args):
+    # Drawn lazily, as the intervals are written
+    randint, expovariate, rate = random.randint, random.expovariate, 1.0 / args.avg_time
     for _ in range(n_ints):
-        int_time = min(max_time, int(ceil(random.expovariate(1.0 / args.avg_time))))
-        start = random.randint(0, max_time - int_time)
-        finish = start + int_time
-        weight = random.randint(args.min_weight, args.max_weight)
-        out_file.write(f'{start} {finish} {weight}\n')
+        int_time = min(max_time, ceil(expovariate(rate)))
+        start = randint(0, max_time - int_time)
+        yield start, start + int_time, randint(args.min_weight, args.max_weight)
 
 
 def main(args):
     out_dir = Path(args.output_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
     max_len = len(str(args.num_samples))
+    extension = args.extension or ('bin' if args.binary else 'txt')
     for ix in range(1, args.num_samples + 1):
         n_ints = args.min_size + int((ix - 1) * (args.max_size - args.min_size) / (args.num_samples - 1))
-        file_name = f'{args.prefix}_{ix:0{max_len}}_{n_ints}.{args.extension}'
+        file_name = f'{args.prefix}_{ix:0{max_len}}_{n_ints}.{extension}'
         out_path = out_dir / file_name
-        with out_path.open('w') as out_file:
-            sample(n_ints, args, out_file)
+        if args.binary:
+            write_instance(out_path, 'interval-scheduling', n_ints, sample(n_ints, args))
+        else:
+            write_text_instance(out_path, n_ints, sample(n_ints, args))
 
 
 if __name__ == "__main__":
@@ -46,8 +56,12 @@ if __name__ == "__main__":
     parser.add_argument(
         "--extension",
         required=False,
-        default='txt',
-        help="Filename extension",
+        help="Filename extension, txt or bin by default",
+    )
+    parser.add_argument(
+        "--binary",
+        action='store_true',
+        help="Write instances in the binary format of prooflog.instances",
     )
     parser.add_argument(
         "--num-samples",
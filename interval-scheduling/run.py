@@ -1,120 +1,316 @@
 import argparse
-from functools import cache
+from array import array
+from bisect import bisect_right
+import heapq
 from pathlib import Path
 import sys
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from prooflog import ProofWriter, TermTable, accumulate, as_columns, is_binary_instance, open_output, phase, read_instance, tight_big_m
+from prooflog.incremental import ProofState
+from prooflog.parallel import render_parallel
+from prooflog.runners import add_arguments, report, run_main
+
+
+# Constraints derived by declare_merge for each prefix
+CONSTRAINTS_PER_PREFIX = 10
+
 
 class ProofManager:
-    def __init__(self, instance, pairs, target_path):
+    def __init__(self, instance, pairs, target_path, compress='none', prefix_sums=False, stats=None, verifier=None,
+                 previous=None, keep_state=False, workers=1):
         self.target_path = target_path
+        self.prefix_sums = prefix_sums
+        self.stats = stats
+        self.workers = workers
+        # Blocks of an earlier proof that may be copied, and whether to
+        # record this proof's blocks for later runs
+        self.previous = previous
+        self.keep_state = keep_state
         self.instance = instance
         self.pairs = pairs
-        self.counter = max(pairs.values())
+        self.writer = ProofWriter(target_path, max(pairs.values(), default=0), compress, stats=stats, verifier=verifier)
         self.write_line('pseudo-Boolean proof version 1.2', is_constraint=False)
-        self.write_line(f'f {self.counter} 0', is_constraint=False)
+        self.write_line(f'f {self.writer.counter} 0', is_constraint=False)
 
 
     def run(self):
-        self.big_m = 20 * sum(w for _, _, w in self.instance)
         self.intervals_sorted = [(ix, *i) for ix, i in enumerate(self.instance)]
         self.intervals_sorted.sort(key=lambda x: x[2]) # sort by finish time
-        score, items, bound = self.generate_proof(len(self.intervals_sorted) - 1)
-        self.write_line('output NONE', is_constraint=False)
-        self.write_line(f'conclusion BOUNDS {-score} : {bound} {-score} : ' +
-                        ' '.join(f'x[{ix}]' if ix in items else f'~x[{ix}]' for ix in range(len(self.instance))), is_constraint=False)
-        self.write_line('end pseudo-Boolean proof', is_constraint=False)
-
-
-    def next_available(self, ix):
-        _, last_start, _, _ = self.intervals_sorted[ix]
-        last_avail_index = ix - 1
-        while last_avail_index >= 0:
-            _, _, candidate_finish, _ = self.intervals_sorted[last_avail_index]
-            if candidate_finish <= last_start:
-                break
+        self.predecessors = last_compatible(
+            [start for _, start, _, _ in self.intervals_sorted], [finish for _, _, finish, _ in self.intervals_sorted]
+        )
+        self.terms = TermTable(
+            [w for _, _, _, w in self.intervals_sorted],
+            [f'x[{ix}]' for ix, _, _, _ in self.intervals_sorted],
+        )
+        # DP state per prefix: best score and whether its last interval is
+        # taken, both found by best_scores before any proof is written, and
+        # the ID of the justified bound
+        n_intervals = len(self.intervals_sorted)
+        with phase(self.stats, 'solve'):
+            self.scores, self.taken = best_scores([w for _, _, _, w in self.intervals_sorted], self.predecessors)
+        self.bounds = array('q', [0]) * n_intervals
+        self.state = ProofState('interval-scheduling', self.intervals_sorted) if self.keep_state else None
+        with self.writer:
+            if self.prefix_sums:
+                with phase(self.stats, 'derive_prefix_bounds'):
+                    bound = self.derive_prefix_bounds()
             else:
-                last_avail_index -= 1
-        return last_avail_index
+                with phase(self.stats, 'generate_proof'):
+                    for prefix in range(n_intervals - 1, -1, -1):
+                        self.write_line(f'* Splitting prefix {prefix} into subproblems for prefixes {prefix - 1} and {self.predecessors[prefix]}', is_constraint=False)
+                    if self.workers > 1:
+                        # A block of declare_merge grows with the length of its prefix
+                        self.bounds = array('q', render_parallel(
+                            self.writer, self.render_prefixes, [CONSTRAINTS_PER_PREFIX] * n_intervals,
+                            range(1, n_intervals + 1), self.workers,
+                        ))
+                    else:
+                        reusable = self.reusable_prefixes()
+                        for prefix in range(n_intervals):
+                            self.justify_prefix(prefix, reusable)
+                    bound = self.bounds[-1]
+                if self.stats is not None:
+                    # Each prefix asks for two smaller ones; the empty prefix counts as a subproblem
+                    self.stats.record_memo(1 + 2 * n_intervals, n_intervals + 1)
+            with phase(self.stats, 'conclusion'):
+                score = self.scores[-1]
+                items = {self.intervals_sorted[prefix][0] for prefix in chosen_prefixes(self.predecessors, self.taken)}
+                self.write_line('output NONE', is_constraint=False)
+                self.write_line(f'conclusion BOUNDS {-score} : {bound} {-score} : ' +
+                                ' '.join(f'x[{ix}]' if ix in items else f'~x[{ix}]' for ix in range(len(self.instance))), is_constraint=False)
+                self.write_line('end pseudo-Boolean proof', is_constraint=False)
+        return -score
+
+
+    def score(self, prefix):
+        return self.scores[prefix] if prefix >= 0 else 0
+
+
+    def reusable_prefixes(self):
+        # Prefixes made of the same intervals in the same places as in the
+        # previous proof, whose blocks can be copied from it
+        if self.previous is None:
+            return 0
+        old = self.previous.state
+        reusable = 0
+        for old_row, row in zip(old.rows, self.intervals_sorted):
+            if old_row != tuple(row):
+                break
+            reusable += 1
+        return reusable
+
+
+    def justify_prefix(self, prefix, reusable):
+        if self.state is not None:
+            start, base = self.writer.tell(), self.writer.counter
+        if prefix < reusable:
+            shift, (_, _, bound) = self.previous.copy(prefix, self.writer)
+            self.bounds[prefix] = bound + shift
+        else:
+            self.generate_proof(prefix)
+        if self.state is not None:
+            self.state.record(prefix, start, self.writer.tell(), base, self.writer.counter - base,
+                              (self.scores[prefix], self.taken[prefix], self.bounds[prefix]))
+
+
+    def render_prefixes(self, writer, lo, hi):
+        # Runs in a worker process, which writes its blocks on its own
+        self.writer = writer
+        for prefix in range(lo, hi):
+            self.generate_proof(prefix)
+        return self.bounds[lo:hi]
 
 
-    @cache
     def generate_proof(self, prefix):
-        if prefix < 0:
-            return 0, list(), None
-        last_avail_index = self.next_available(prefix)
-        self.write_line(f'* Splitting prefix {prefix} into subproblems for prefixes {prefix - 1} and {last_avail_index}', is_constraint=False)
-        score_no_take, items_no_take, _ = self.generate_proof(prefix - 1)
-        score_take, items_take, _ = self.generate_proof(last_avail_index)
-        return self.declare_merge(
-            prefix, score_take, score_no_take, items_take, items_no_take
+        score_no_take = self.score(prefix - 1)
+        score_take = self.score(self.predecessors[prefix])
+        self.bounds[prefix] = self.declare_merge(prefix, score_take, score_no_take)
+
+
+    def derive_prefix_bounds(self):
+        # Every set of intervals containing a common time point is a clique,
+        # so at most one of them can be taken. Sweeping over time, derive the
+        # constraint for the intervals containing the current point from the
+        # previous one, and add it to the running bound weighted by how much
+        # the optimum for intervals finishing by that point has grown. Each
+        # interval then ends up with at least its own weight, so weakening
+        # the excess away leaves the objective bound. Empty intervals contain
+        # no time point, so the gains come from the optimum without them, and
+        # each adds at most its own weight on top.
+        nonempty = [row for row in self.intervals_sorted if row[1] < row[2]]
+        scores = self.scores
+        if len(nonempty) < len(self.intervals_sorted):
+            scores, _ = best_scores(
+                [w for _, _, _, w in nonempty],
+                last_compatible([start for _, start, _, _ in nonempty], [finish for _, _, finish, _ in nonempty]),
+            )
+        gains = dict()
+        previous = 0
+        for prefix, (_, _, finish, _) in enumerate(nonempty):
+            if prefix + 1 == len(nonempty) or nonempty[prefix + 1][2] != finish:
+                if scores[prefix] > previous:
+                    gains[finish - 1] = scores[prefix] - previous
+                previous = scores[prefix]
+        starts = dict()
+        for ix, (start, finish, _) in enumerate(self.instance):
+            if start < finish:
+                starts.setdefault(start, list()).append(ix)
+        clique, members = None, dict()
+        coverage = [0] * len(self.instance)
+        bound = None
+        for time in sorted(starts.keys() | gains.keys()):
+            stale = [ix for ix, finish in members.items() if finish <= time]
+            for ix in stale:
+                del members[ix]
+            if stale and members:
+                clique = self.write_line('pol', *accumulate(clique, [f'x[{ix}]' for ix in stale]))
+            for jx in starts.get(time, list()):
+                clique = self.extend_clique(clique, members, jx)
+                members[jx] = self.instance[jx][1]
+            if time in gains:
+                for ix in members:
+                    coverage[ix] += gains[time]
+                bound = self.write_line('pol', *accumulate(bound, [f'{clique} {gains[time]} *']))
+                self.write_line(f'* Prefix bound up to time {time + 1}', is_constraint=False)
+        excess = [
+            f'x[{ix}] {coverage[ix] - w} *'
+            for ix, (_, _, w) in enumerate(self.instance)
+            if coverage[ix] > w
+        ]
+        empty = [
+            f'~x[{ix}] {w} *'
+            for ix, (start, finish, w) in enumerate(self.instance)
+            if start >= finish and w > 0
+        ]
+        if excess or empty:
+            bound = self.write_line('pol', *accumulate(bound, excess + empty))
+        if bound is None:
+            # Every weight is zero, and so is the objective
+            bound = self.write_line('rup', *self.terms.prefix(len(self.intervals_sorted), negated=True), '>= 0', ';')
+        return bound
+
+
+    def extend_clique(self, clique, members, jx):
+        # Adds jx, which overlaps every member, to the clique constraint
+        if len(members) <= 1:
+            return self.pairs[(*members, jx) if members else (jx, jx)]
+        return self.write_line(
+            'pol',
+            f'{clique} {len(members) - 1} *',
+            *[f'{self.pairs[(ix, jx)]} +' for ix in members],
+            f'{len(members)} d'
         )
 
 
-    def declare_merge(self, prefix, score_take, score_no_take, items_take, items_no_take):
-        last_index, _, _, last_weight = self.intervals_sorted[prefix]
-        take_opt = score_take + last_weight >= score_no_take
-        score = score_take + last_weight if take_opt else score_no_take
-        items = items_take + [last_index] if take_opt else items_no_take
+    def declare_merge(self, prefix, score_take, score_no_take):
+        last_index = self.intervals_sorted[prefix][0]
+        score = self.scores[prefix]
+        # Each big-M is just large enough to satisfy its constraint whatever
+        # the terms of the prefix are
+        _, high = self.terms.prefix_range(prefix)
+        low_full, high_full = self.terms.prefix_range(prefix + 1)
         self.write_line(*[
             f'red',
-            *[f'{-w} x[{ix}]' for ix, _, _, w in self.intervals_sorted[:prefix]],
-            f'{self.big_m} x[{last_index}]',
+            *self.terms.prefix(prefix, negated=True),
+            f'{tight_big_m(-score_no_take, -high)} x[{last_index}]',
             f'>= {-score_no_take} ;',
             f'x[{last_index}] -> 0'
         ])
         self.write_line(*[
             f'red',
-            *[f'{-w} x[{ix}]' for ix, _, _, w in self.intervals_sorted[:prefix]],
-            f'{self.big_m} ~x[{last_index}]',
+            *self.terms.prefix(prefix, negated=True),
+            f'{tight_big_m(-score_take, -high)} ~x[{last_index}]',
             f'>= {-score_take} ;',
             f'x[{last_index}] -> 1'
         ])
+        big_m = tight_big_m(-score, -high_full)
         full_bound_no_take = self.write_line(*[
             f'red',
-            *[f'{-w} x[{ix}]' for ix, _, _, w in self.intervals_sorted[:prefix+1]],
-            f'{self.big_m} x[{last_index}]',
+            *self.terms.prefix(prefix + 1, negated=True),
+            f'{big_m} x[{last_index}]',
             f'>= {-score} ;',
             f'x[{last_index}] -> 0'
         ])
         full_bound_take = self.write_line(*[
             f'red',
-            *[f'{-w} x[{ix}]' for ix, _, _, w in self.intervals_sorted[:prefix+1]],
-            f'{self.big_m} ~x[{last_index}]',
+            *self.terms.prefix(prefix + 1, negated=True),
+            f'{big_m} ~x[{last_index}]',
             f'>= {-score} ;',
             f'x[{last_index}] -> 1'
         ])
         lhs_neg = self.write_line(*[
             f'red',
-            *[f'{-w} x[{ix}]' for ix, _, _, w in self.intervals_sorted[:prefix+1]],
-            f'{self.big_m} ~z[{last_index}]',
+            *self.terms.prefix(prefix + 1, negated=True),
+            f'{big_m} ~z[{last_index}]',
             f'>= {-score} ;',
             f'z[{last_index}] -> 0'
         ])
         lhs_pos = self.write_line(*[
             f'red',
-            *[f'{w} x[{ix}]' for ix, _, _, w in self.intervals_sorted[:prefix+1]],
-            f'{self.big_m} z[{last_index}]',
+            *self.terms.prefix(prefix + 1),
+            f'{tight_big_m(1 + score, low_full)} z[{last_index}]',
             f'>= {1 + score} ;',
             f'z[{last_index}] -> 1'
         ])
         self.write_line('pol', f'{lhs_pos} 1 *', f'{full_bound_no_take} 1 *', '+')
         self.write_line('pol', f'{lhs_pos} 1 *', f'{full_bound_take} 1 *', '+')
         aux_bd = self.write_line('rup', f'1 z[{last_index}] >= 1 ;')
-        full_bound = self.write_line('pol', f'{aux_bd} {self.big_m} *', f'{lhs_neg} 1 *', '+')
+        full_bound = self.write_line('pol', f'{aux_bd} {big_m} *', f'{lhs_neg} 1 *', '+')
         self.write_line(f'* Justified the bound for prefix {prefix}', is_constraint=False)
-        return score, items, full_bound
+        return full_bound
 
 
     def write_line(self, *line, is_constraint=True):
-        with self.target_path.open('a') as f:
-            f.write(' '.join(line) + '\n')
-        if is_constraint:
-            self.counter += 1
-            return self.counter
+        return self.writer.write_line(*line, is_constraint=is_constraint)
+
+
+
+def last_compatible(starts, finishes):
+    # For each prefix of intervals sorted by finish time, the last earlier
+    # interval finishing by its start, or -1
+    return array('q', [
+        bisect_right(finishes, start, 0, ix) - 1
+        for ix, start in enumerate(starts)
+    ])
+
 
+def best_scores(weights, predecessors):
+    """Best score of every prefix of the intervals sorted by finish time, and whether taking its last interval attains it.
+
+    Each prefix either leaves its last interval out, scoring as the prefix
+    one shorter, or takes it on top of the prefix ending at its predecessor.
+    Ties take the interval.
+    """
+    scores = array('q', bytes(8 * len(weights)))
+    taken = bytearray(len(weights))
+    for prefix, weight in enumerate(weights):
+        score_no_take = scores[prefix - 1] if prefix > 0 else 0
+        score_take = weight + (scores[predecessors[prefix]] if predecessors[prefix] >= 0 else 0)
+        taken[prefix] = score_take >= score_no_take
+        scores[prefix] = score_take if taken[prefix] else score_no_take
+    return scores, taken
+
+
+def chosen_prefixes(predecessors, taken):
+    # The prefixes whose last interval is in the best schedule for all of them
+    prefixes = list()
+    prefix = len(taken) - 1
+    while prefix >= 0:
+        if taken[prefix]:
+            prefixes.append(prefix)
+            prefix = predecessors[prefix]
+        else:
+            prefix -= 1
+    return prefixes
 
 
 def parse_instance(path):
+    if is_binary_instance(path):
+        n_intervals, res = read_instance(path, 'interval-scheduling')
+        assert len(res) == n_intervals
+        return res
     with path.open() as f:
         n_intervals = int(f.readline().strip())
         res = [[int(x) for x in line.strip().split()] for line in f]
@@ -122,43 +318,93 @@ def parse_instance(path):
         return res
 
 
-def generate_formula(intervals, path):
+def overlapping_pairs(intervals):
+    # Yields every overlapping (ix, jx) with ix <= jx, in the order of a
+    # scan over ix then jx, by sweeping over start times with a heap of
+    # active intervals keyed by finish time.
+    overlaps = [list() for _ in intervals]
+    active = list()
+    for jx in sorted(range(len(intervals)), key=lambda ix: intervals[ix][0]):
+        start, finish, _ = intervals[jx]
+        if start >= finish:
+            continue
+        while active and active[0][0] <= start:
+            heapq.heappop(active)
+        for _, ix in active:
+            overlaps[ix].append(jx)
+            overlaps[jx].append(ix)
+        heapq.heappush(active, (finish, jx))
+    later = [list() for _ in intervals]
+    for jx, others in enumerate(overlaps):
+        for ix in others:
+            if ix < jx:
+                later[ix].append(jx)
+    for ix, (start, finish, _) in enumerate(intervals):
+        if start < finish:
+            yield ix, ix
+        for jx in later[ix]:
+            yield ix, jx
+
+
+def generate_formula(intervals, path, compress='none'):
     pairs = dict()
     cnt = 1
-    with path.open('w') as f:
+    with open_output(path, compress) as f:
         f.write('min: ' + ' '.join(f'{-w} x[{ix}]' for ix, (_, _, w) in enumerate(intervals)) + '\n')
-        for ix, (s1, f1, _) in enumerate(intervals):
-            for jx, (s2, f2, _) in enumerate(intervals[ix:], ix):
-                if max(s1, s2) < min(f1, f2):
-                    pairs[(ix, jx)] = cnt
-                    pairs[(jx, ix)] = cnt
-                    cnt += 1
-                    if ix < jx:
-                        f.write(f'-1 x[{ix}] -1 x[{jx}] >= -1 ;\n')
-                    else:
-                        f.write(f'-1 x[{ix}] >= -1 ;\n')
+        for ix, jx in overlapping_pairs(intervals):
+            pairs[(ix, jx)] = cnt
+            pairs[(jx, ix)] = cnt
+            cnt += 1
+            if ix < jx:
+                f.write(f'-1 x[{ix}] -1 x[{jx}] >= -1 ;\n')
+            else:
+                f.write(f'-1 x[{ix}] >= -1 ;\n')
     return pairs
 
 
-def prepare_dirs(formula_path, proof_path):
-    formula_path.unlink(missing_ok=True)
-    proof_path.unlink(missing_ok=True)
+def solve(instance_path, stats=None):
+    # The optimum alone, without writing a formula or proof
+    with phase(stats, 'parse_instance'):
+        intervals = parse_instance(instance_path)
+    with phase(stats, 'solve'):
+        # Columns in order of finish time, which the sort keeps stable
+        columns = as_columns(intervals)
+        order = array('q', sorted(range(len(intervals)), key=columns[1].__getitem__))
+        starts, finishes, weights = (array('q', map(column.__getitem__, order)) for column in columns)
+        predecessors = last_compatible(starts, finishes)
+        scores, taken = best_scores(weights, predecessors)
+    return {
+        'size': len(intervals),
+        'optimum': -scores[-1] if scores else 0,
+        'items': sorted(order[prefix] for prefix in chosen_prefixes(predecessors, taken)),
+    }
 
 
-def main(instance_path):
-    formula_path = instance_path.with_suffix('.opb')
-    proof_path = instance_path.with_suffix('.veripb')
-    prepare_dirs(formula_path, proof_path)
-    intervals = parse_instance(instance_path)
-    pairs = generate_formula(intervals, formula_path)
-    ProofManager(intervals, pairs, proof_path).run()
+def main(instance_path, *, compress='none', prefix_sums=False, incremental=False, workers=1, **options):
+    """Writes the formula and proof for an instance and returns a summary.
+
+    The other options are those of prooflog.runners.run_main.
+    """
+    if incremental and (prefix_sums or workers > 1):
+        raise ValueError('Incremental proofs must be dynamic programming proofs written by one process')
+    if workers > 1 and prefix_sums:
+        raise ValueError('Only dynamic programming proofs can be written by several workers')
+
+    def write(formula_path, proof_path, stats, verifier, previous):
+        with phase(stats, 'parse_instance'):
+            intervals = parse_instance(instance_path)
+        with phase(stats, 'generate_formula'):
+            pairs = generate_formula(intervals, formula_path, compress)
+        return len(intervals), ProofManager(
+            intervals, pairs, proof_path, compress, prefix_sums, stats, verifier, previous, incremental, workers
+        )
+
+    return run_main('interval-scheduling', instance_path, solve, write, [prefix_sums], compress=compress,
+                    incremental=incremental, **options)
     
     
 if __name__ == '__main__':
-    sys.setrecursionlimit(10_000)
     parser = argparse.ArgumentParser()
-    parser.add_argument(
-        'instance_path', help='Instance path'
-    )
+    add_arguments(parser, 'the chosen intervals')
     args = parser.parse_args()
-    main(Path(args.instance_path))
\ No newline at end of file
+    report(args, main(**vars(args)))
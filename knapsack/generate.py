@@ -0,0 +1,128 @@
+import argparse
+from pathlib import Path
+import random
+
+
+def percentage(x):
+    x = int(x)
+    if x < 0:
+        raise argparse.ArgumentTypeError("Cannot have negative percentage")
+    if x > 100:
+        raise argparse.ArgumentTypeError("Cannot have > 100%")
+    return x
+
+
+def sample(n_items, args):
+    items = [
+        (random.randint(args.min_weight, args.max_weight), random.randint(args.min_profit, args.max_profit))
+        for _ in range(n_items)
+    ]
+    capacity = sum(w for w, _ in items) * args.capacity_pct // 100
+    return capacity, items
+
+
+def write_instance(path, capacity, items):
+    with path.open('w') as f:
+        f.write(f'{len(items)} {capacity}\n')
+        f.write(''.join(f'{w} {p}\n' for w, p in items))
+
+
+def main(args):
+    out_dir = Path(args.output_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    max_len = len(str(args.num_samples))
+    for ix in range(1, args.num_samples + 1):
+        n_items = args.min_size + int((ix - 1) * (args.max_size - args.min_size) / max(args.num_samples - 1, 1))
+        file_name = f'{args.prefix}_{ix:0{max_len}}_{n_items}.{args.extension}'
+        write_instance(out_dir / file_name, *sample(n_items, args))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Sample knapsack problems"
+    )
+    parser.add_argument(
+        "--output-dir",
+        "-o",
+        required=True,
+        help="Output directory for instance files",
+    )
+    parser.add_argument(
+        "--prefix",
+        "-p",
+        required=True,
+        help="Filename prefix",
+    )
+    parser.add_argument(
+        "--extension",
+        required=False,
+        default='txt',
+        help="Filename extension",
+    )
+    parser.add_argument(
+        "--num-samples",
+        "-n",
+        required=True,
+        type=int,
+        help="Number of samples",
+    )
+    parser.add_argument(
+        "--seed",
+        "-s",
+        required=False,
+        type=int,
+        help="Random seed",
+    )
+    parser.add_argument(
+        "--min-size",
+        type=int,
+        required=False,
+        default=8,
+        help="Minimum number of items",
+    )
+    parser.add_argument(
+        "--max-size",
+        type=int,
+        required=False,
+        default=16,
+        help="Maximum number of items",
+    )
+    parser.add_argument(
+        "--min-weight",
+        type=int,
+        required=False,
+        default=1,
+        help="Minimum item weight",
+    )
+    parser.add_argument(
+        "--max-weight",
+        type=int,
+        required=False,
+        default=10,
+        help="Maximum item weight",
+    )
+    parser.add_argument(
+        "--min-profit",
+        type=int,
+        required=False,
+        default=1,
+        help="Minimum item profit",
+    )
+    parser.add_argument(
+        "--max-profit",
+        type=int,
+        required=False,
+        default=10,
+        help="Maximum item profit",
+    )
+    parser.add_argument(
+        "--capacity-pct",
+        type=percentage,
+        required=False,
+        default=50,
+        help="Capacity as a percentage of the total item weight (>= 0, <= 100)",
+    )
+    args = parser.parse_args()
+    if args.seed is not None:
+        random.seed(args.seed)
+    main(args)
@@ -0,0 +1,3 @@
+#!/usr/bin/env bash
+NUM_SAMPLES=$1
+python knapsack/generate.py --prefix "knapsack" --output-dir samples/knapsack --num-samples $NUM_SAMPLES --seed 0 --min-size 10 --max-size 100 --min-weight 1 --max-weight 100 --min-profit 1 --max-profit 100 --capacity-pct 50
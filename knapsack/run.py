@@ -0,0 +1,267 @@
+import argparse
+from bisect import bisect_right
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from prooflog import ProofWriter, is_binary_instance, open_output, phase, read_instance, tight_big_m
+from prooflog.runners import add_arguments, report, run_main
+
+
+class ProofManager:
+    """Writes the proof for the knapsack DP over layers of (weight, profit) states.
+
+    Layer i holds the states reachable by deciding the first i items, as in
+    knapsack.cc, whose extension variables this proof uses: ``w{i}_{W}``
+    means the first i items weigh at least W, ``p{i}_{P}`` that they make a
+    profit of at most P, and ``c{i}_{W}_{P}`` is their conjunction. Only
+    the Pareto frontier of each layer is kept. A transition to a dominated
+    state is justified straight into the frontier state dominating it,
+    which is lighter and more profitable, so dominated states never get
+    variables of their own.
+    """
+
+    def __init__(self, items, capacity, target_path, compress='none', stats=None, verifier=None):
+        self.items = items
+        self.capacity = capacity
+        self.stats = stats
+        # The only formula constraint is the capacity, with ID 1
+        self.writer = ProofWriter(target_path, 1, compress, stats=stats, verifier=verifier)
+        self.write_line('pseudo-Boolean proof version 2.0', is_constraint=False)
+
+
+    def run(self):
+        # States of the current layer as (weight, profit, how), by increasing
+        # weight and profit, where how links back through the decisions made
+        frontier = [(0, 0, None)]
+        # Variable names and the IDs of their first defining constraint
+        self.wsums, self.psums, self.conjunctions = dict(), dict(), dict()
+        weight_terms, profit_terms = list(), list()
+        # The weight and profit of all the items decided so far, the most
+        # that their sums in the state definitions can reach
+        self.weight_total = self.profit_total = 0
+        layer_starts = list()
+        n_states = n_transitions = 0
+        with self.writer:
+            with phase(self.stats, 'generate_proof'):
+                for layer, (weight, profit) in enumerate(self.items):
+                    layer_starts.append(self.writer.counter + 1)
+                    if layer >= 2:
+                        # The verifier no longer needs the layer before last
+                        self.write_line('del range', f'{layer_starts[layer - 2]}', f'{layer_starts[layer - 1] - 1}', is_constraint=False)
+                    weight_terms.append(f'{weight} x{layer}')
+                    profit_terms.append(f'{profit} x{layer}')
+                    self.weight_sums = (' '.join(weight_terms), ' '.join(f'-{t}' for t in weight_terms))
+                    self.profit_sums = (' '.join(profit_terms), ' '.join(f'-{t}' for t in profit_terms))
+                    self.weight_total += weight
+                    self.profit_total += profit
+                    next_states = next_frontier(frontier, weight, profit, self.capacity)
+                    self.justify_layer(layer, frontier, next_states)
+                    n_transitions += len(frontier) + sum(1 for w, _, _ in frontier if w + weight <= self.capacity)
+                    n_states += len(next_states)
+                    frontier = next_states
+                if self.stats is not None:
+                    # Every transition asks for a state of the next layer
+                    self.stats.record_memo(n_transitions, n_states)
+            with phase(self.stats, 'conclusion'):
+                best, _ = self.conclude(frontier)
+        return -best
+
+
+    def justify_layer(self, layer, frontier, next_states):
+        weight, _ = self.items[layer]
+        previous = (self.wsums, self.psums, self.conjunctions)
+        self.wsums, self.psums, self.conjunctions = dict(), dict(), dict()
+        next_weights = [w for w, _, _ in next_states]
+        for state_weight, state_profit, _ in frontier:
+            # The frontier state of the next layer that is at least as good
+            # as each successor: the heaviest one weighing no more than it
+            notake = next_states[bisect_right(next_weights, state_weight) - 1]
+            conj_notake = self.state_variable(layer, notake)
+            old = None if layer == 0 else (
+                previous[0][state_weight], previous[1][state_profit], previous[2][(state_weight, state_profit)]
+            )
+            # old state /\ ~x -> new state
+            self.justify_transition(layer, old, notake, f'x{layer}')
+            if state_weight + weight <= self.capacity:
+                take = next_states[bisect_right(next_weights, state_weight + weight) - 1]
+                conj_take = self.state_variable(layer, take)
+                # old state /\ x -> new state
+                self.justify_transition(layer, old, take, f'~x{layer}')
+                if old is not None:
+                    # old state -> one of the new states
+                    successors = [f'1 {conj_notake}'] + ([f'1 {conj_take}'] if conj_take != conj_notake else [])
+                    self.write_line('rup', f'1 ~{old[2]}', *successors, '>= 1 ;')
+            elif old is None:
+                # old state -> not x
+                self.write_line('rup', f'1 ~x{layer}', '>= 1 ;')
+            else:
+                (wsum, wsum_id), _, conj = old
+                self.write_line('pol', '1', f'{wsum_id}', '+ s')
+                self.write_line('rup', f'1 ~{wsum}', f'1 ~x{layer}', '>= 1 ;')
+                self.write_line('rup', f'1 ~{conj}', f'1 ~x{layer}', '>= 1 ;')
+                # old state -> new state
+                self.write_line('rup', f'1 ~{conj}', f'1 {conj_notake}', '>= 1 ;')
+        # have to take one of the states at this level
+        self.write_line('rup', *[f'1 {conj}' for conj in sorted(self.conjunctions.values())], '>= 1 ;')
+
+
+    def justify_transition(self, layer, old, state, literal):
+        (wsum, wsum_id), (psum, psum_id) = self.wsums[state[0]], self.psums[state[1]]
+        conj = self.conjunctions[state[:2]]
+        if old is None:
+            self.write_line('rup', f'1 {literal}', f'1 {wsum}', '>= 1 ;')
+            self.write_line('rup', f'1 {literal}', f'1 {psum}', '>= 1 ;')
+            self.write_line('rup', f'1 {literal}', f'1 {conj}', '>= 1 ;')
+            return
+        (_, old_wsum_id), (_, old_psum_id), old_conj = old
+        self.write_line('pol', f'{old_wsum_id}', f'{wsum_id + 1}', '+ s')
+        self.write_line('rup', f'1 ~{old_conj}', f'1 {literal}', f'1 {wsum}', '>= 1 ;')
+        self.write_line('pol', f'{old_psum_id}', f'{psum_id + 1}', '+ s')
+        self.write_line('rup', f'1 ~{old_conj}', f'1 {literal}', f'1 {psum}', '>= 1 ;')
+        self.write_line('rup', f'1 ~{old_conj}', f'1 {literal}', f'1 {conj}', '>= 1 ;')
+
+
+    def state_variable(self, layer, state):
+        # Defines the variables for a state of layer + 1 on first use, with
+        # big-M coefficients just large enough for the sums of the decided
+        # items, which are at least 0
+        weight, profit = state[:2]
+        if weight not in self.wsums:
+            # extension variable for partial sum of weights
+            name = f'w{layer + 1}_{weight}'
+            self.wsums[weight] = (name, self.write_line(
+                'red', f'{tight_big_m(weight, 0)} ~{name}', self.weight_sums[0], f'>= {weight} ;', f'{name} -> 0'
+            ))
+            self.write_line('red', f'{tight_big_m(1 - weight, -self.weight_total)} {name}', self.weight_sums[1], f'>= {1 - weight} ;', f'{name} -> 1')
+        if profit not in self.psums:
+            # extension variable for partial sum of profits
+            name = f'p{layer + 1}_{profit}'
+            self.psums[profit] = (name, self.write_line(
+                'red', f'{tight_big_m(-profit, -self.profit_total)} ~{name}', self.profit_sums[1], f'>= {-profit} ;', f'{name} -> 0'
+            ))
+            self.write_line('red', f'{tight_big_m(profit + 1, 0)} {name}', self.profit_sums[0], f'>= {profit + 1} ;', f'{name} -> 1')
+        if (weight, profit) not in self.conjunctions:
+            # extension variable for conjunction of weights and profits
+            name = f'c{layer + 1}_{weight}_{profit}'
+            wsum, psum = self.wsums[weight][0], self.psums[profit][0]
+            self.conjunctions[(weight, profit)] = name
+            self.write_line('red', f'2 ~{name}', f'1 {wsum}', f'1 {psum}', '>= 2 ;', f'{name} -> 0')
+            self.write_line('red', f'1 {name}', f'1 ~{wsum}', f'1 ~{psum}', '>= 1 ;', f'{name} -> 1')
+        return self.conjunctions[(weight, profit)]
+
+
+    def conclude(self, frontier):
+        # Profits increase along the frontier, so the last state is the best
+        profits = [p for _, p, _ in frontier]
+        if self.items:
+            # establish that profit <= x -> profit <= y for each x < y on the final layer
+            for x, y in zip(profits, profits[1:]):
+                self.write_line('pol', f'{self.psums[x][1]}', f'{self.psums[y][1] + 1}', '+ s')
+                self.write_line('rup', f'1 ~{self.psums[x][0]}', f'1 {self.psums[y][0]}', '>= 1 ;')
+            # profit <= best profit on final layer
+            self.write_line('rup', f'1 {self.psums[profits[-1]][0]}', '>= 1 ;')
+        solution = decisions(frontier[-1][2], len(self.items))
+        self.write_line('soli', *[f'x{ix}' if taken else f'~x{ix}' for ix, taken in enumerate(solution)])
+        if self.items:
+            self.write_line('pol', '-1', f'{self.psums[profits[-1]][1]}', '+')
+        # need to explicitly derive the lower bound
+        self.write_line('rup', *[f'-{p} x{ix}' for ix, (_, p) in enumerate(self.items)], f'>= {-profits[-1]} ;')
+        self.write_line('output NONE', is_constraint=False)
+        self.write_line(f'conclusion BOUNDS {-profits[-1]} {-profits[-1]}', is_constraint=False)
+        self.write_line('end pseudo-Boolean proof', is_constraint=False)
+        return profits[-1], solution
+
+
+    def write_line(self, *line, is_constraint=True):
+        return self.writer.write_line(*line, is_constraint=is_constraint)
+
+
+
+def next_frontier(frontier, weight, profit, capacity):
+    """The Pareto frontier of the states after deciding an item.
+
+    frontier holds (weight, profit, how) states by increasing weight with
+    strictly increasing profit. Every state may leave the item out, or take
+    it if it still fits, and of the states reached only those that no other
+    state beats on both weight and profit are kept, in the same order.
+    Linear in the size of frontier apart from the sort, which finds two
+    runs that are already in order.
+    """
+    reached = [(w, p, (False, how)) for w, p, how in frontier]
+    reached.extend((w + weight, p + profit, (True, how)) for w, p, how in frontier if w + weight <= capacity)
+    reached.sort(key=lambda state: (state[0], -state[1]))
+    next_states = list()
+    for state in reached:
+        if not next_states or state[1] > next_states[-1][1]:
+            next_states.append(state)
+    return next_states
+
+
+def decisions(how, n_items):
+    # Whether each item is taken, following the links of a state back
+    taken = list()
+    while how is not None:
+        took, how = how
+        taken.append(took)
+    assert len(taken) == n_items
+    return taken[::-1]
+
+
+def parse_instance(path):
+    # The capacity, and the (weight, profit) of every item
+    if is_binary_instance(path):
+        capacity, items = read_instance(path, 'knapsack')
+        assert capacity >= 0
+        return capacity, items
+    with path.open() as f:
+        n_items, capacity = [int(x) for x in f.readline().split()]
+        items = [tuple(int(x) for x in line.split()) for line in f]
+        assert len(items) == n_items and capacity >= 0
+        return capacity, items
+
+
+def generate_formula(items, capacity, path, compress='none'):
+    with open_output(path, compress) as f:
+        f.write('min:' + ''.join(f' -{p} x{ix}' for ix, (_, p) in enumerate(items)) + ' ;\n')
+        f.write(''.join(f'-{w} x{ix} ' for ix, (w, _) in enumerate(items)) + f'>= -{capacity} ;\n')
+
+
+def solve(instance_path, stats=None):
+    # The optimum alone, without writing a formula or proof
+    with phase(stats, 'parse_instance'):
+        capacity, items = parse_instance(instance_path)
+    with phase(stats, 'solve'):
+        frontier = [(0, 0, None)]
+        for weight, profit in items:
+            frontier = next_frontier(frontier, weight, profit, capacity)
+    _, best, how = frontier[-1]
+    solution = decisions(how, len(items))
+    return {'size': len(items), 'optimum': -best, 'items': [ix for ix, taken in enumerate(solution) if taken]}
+
+
+def main(instance_path, *, compress='none', prefix_sums=False, incremental=False, **options):
+    """Writes the formula and proof for an instance and returns a summary.
+
+    The other options are those of prooflog.runners.run_main.
+    """
+    if prefix_sums:
+        raise ValueError('There is no prefix sums proof for knapsack')
+    if incremental:
+        raise ValueError('There is no incremental proof for knapsack')
+
+    def write(formula_path, proof_path, stats, verifier, previous):
+        with phase(stats, 'parse_instance'):
+            capacity, items = parse_instance(instance_path)
+        with phase(stats, 'generate_formula'):
+            generate_formula(items, capacity, formula_path, compress)
+        return len(items), ProofManager(items, capacity, proof_path, compress, stats, verifier)
+
+    return run_main('knapsack', instance_path, solve, write, compress=compress, **options)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    add_arguments(parser, 'the chosen items', prefix_sums=False, incremental=False, workers=False)
+    args = parser.parse_args()
+    report(args, main(**vars(args)))
@@ -0,0 +1,6 @@
+from prooflog.compress import COMPRESSIONS, open_input, open_output, output_paths, with_compression_suffix
+from prooflog.instances import as_columns, is_binary_instance, read_instance, write_instance, write_text_instance
+from prooflog.stats import Stats, phase
+from prooflog.terms import TermTable, accumulate, tight_big_m
+from prooflog.verify import DEFAULT_COMMAND, Verifier
+from prooflog.writer import ProofWriter
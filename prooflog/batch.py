@@ -0,0 +1,152 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import csv
+import glob
+import json
+import os
+from pathlib import Path
+import time
+
+from prooflog.cache import DEFAULT_MAX_MIB
+from prooflog.compress import COMPRESSIONS, output_paths
+from prooflog.runners import RUNNERS, load_runner
+
+
+FIELDS = ['instance', 'runner', 'status', 'size', 'optimum', 'seconds', 'bytes', 'cache']
+
+
+def find_instances(pattern, extension):
+    path = Path(pattern)
+    if path.is_dir():
+        return sorted(path.glob(f'*.{extension}'))
+    return sorted(Path(p) for p in glob.glob(pattern))
+
+
+def up_to_date(instance_path, compress):
+    mtime = instance_path.stat().st_mtime
+    return all(p.exists() and p.stat().st_mtime >= mtime for p in output_paths(instance_path, compress))
+
+
+def output_bytes(instance_path, compress):
+    return sum(p.stat().st_size for p in output_paths(instance_path, compress) if p.exists())
+
+
+def run_instance(runner, instance_path, compress, prefix_sums, cache_dir=None, cache_mib=DEFAULT_MAX_MIB):
+    start = time.perf_counter()
+    summary = load_runner(runner).main(instance_path, compress=compress, prefix_sums=prefix_sums, cache_dir=cache_dir, cache_mib=cache_mib)
+    return {
+        **summary,
+        'status': 'done',
+        'seconds': round(time.perf_counter() - start, 3),
+        'bytes': output_bytes(instance_path, compress),
+    }
+
+
+class Manifest:
+    """Appends one summary row per instance, as CSV or, for .jsonl, JSON lines."""
+
+    def __init__(self, path):
+        self.file = path.open('w', newline='')
+        self.jsonl = path.suffix == '.jsonl'
+        if not self.jsonl:
+            self.csv = csv.DictWriter(self.file, FIELDS)
+            self.csv.writeheader()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc_info):
+        self.file.close()
+
+
+    def write(self, row):
+        if self.jsonl:
+            self.file.write(json.dumps({field: row.get(field) for field in FIELDS}) + '\n')
+        else:
+            self.csv.writerow(row)
+        self.file.flush()
+
+
+
+def main(args):
+    instances = find_instances(args.instances, args.extension)
+    counts = dict.fromkeys(['done', 'skipped', 'failed'], 0)
+    with Manifest(Path(args.manifest)) as manifest, ProcessPoolExecutor(args.workers) as pool:
+        futures = dict()
+        for instance_path in instances:
+            if not args.force and up_to_date(instance_path, args.compress):
+                counts['skipped'] += 1
+                manifest.write({
+                    'instance': str(instance_path), 'runner': args.runner, 'status': 'skipped',
+                    'bytes': output_bytes(instance_path, args.compress),
+                })
+                continue
+            future = pool.submit(run_instance, args.runner, instance_path, args.compress, args.prefix_sums, args.cache, args.cache_size)
+            futures[future] = instance_path
+        for future in as_completed(futures):
+            instance_path = futures[future]
+            try:
+                row = future.result()
+            except Exception as e:
+                # Do not leave partial outputs that would look up to date next time
+                for path in output_paths(instance_path, args.compress):
+                    path.unlink(missing_ok=True)
+                row = {'status': 'failed'}
+                print(f'{instance_path}: {e!r}')
+            counts[row['status']] += 1
+            manifest.write({'instance': str(instance_path), 'runner': args.runner, **row})
+    print(', '.join(f'{count} {status}' for status, count in counts.items()))
+    return counts['failed'] == 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Generate formulas and proofs for many instances in parallel"
+    )
+    parser.add_argument(
+        "runner", choices=list(RUNNERS), help="Which run.py to use"
+    )
+    parser.add_argument(
+        "instances", help="Directory of instances, or a glob pattern matching them"
+    )
+    parser.add_argument(
+        "--manifest",
+        "-m",
+        required=True,
+        help="Summary output, CSV or JSON lines if it ends in .jsonl",
+    )
+    parser.add_argument(
+        "--workers",
+        "-j",
+        type=int,
+        required=False,
+        default=os.cpu_count(),
+        help="Number of worker processes",
+    )
+    parser.add_argument(
+        "--extension",
+        required=False,
+        default='txt',
+        help="Instance filename extension, when given a directory",
+    )
+    parser.add_argument(
+        "--force",
+        action='store_true',
+        help="Regenerate outputs even if they are newer than the instance",
+    )
+    parser.add_argument(
+        '--compress', choices=COMPRESSIONS, default='none', help='Compression for the formula and proof files'
+    )
+    parser.add_argument(
+        '--prefix-sums', action='store_true', help='Derive the bound by accumulating prefix constraints, for a linear-size proof'
+    )
+    parser.add_argument(
+        '--cache', metavar='DIR', help='Reuse formulas and proofs from this cache for instances seen before'
+    )
+    parser.add_argument(
+        '--cache-size', metavar='MIB', type=int, default=DEFAULT_MAX_MIB, help='Evict least recently used cache entries beyond this size'
+    )
+    args = parser.parse_args()
+    raise SystemExit(0 if main(args) else 1)
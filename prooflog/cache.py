@@ -0,0 +1,138 @@
+import argparse
+from contextlib import contextmanager
+import fcntl
+import hashlib
+import json
+import os
+from pathlib import Path
+import shutil
+
+
+# Bump whenever the formulas or proofs written for the same instance change,
+# so that entries made by older code are no longer found
+FORMAT_VERSION = 3
+DEFAULT_MAX_MIB = 10 << 10
+
+
+def link(source, target):
+    target.unlink(missing_ok=True)
+    try:
+        os.link(source, target)
+    except OSError:
+        # Different file systems, or links not supported
+        shutil.copyfile(source, target)
+
+
+class ProofCache:
+    """Formulas and proofs stored under a hash of what they were made from.
+
+    Every entry is a directory named by its key, holding the formula, the
+    proof and the summary returned by the runner. Hits are hard linked into
+    place, and once the store holds more than max_bytes the least recently
+    used entries are removed. Hit, miss and eviction counts are kept in
+    counts.json next to the entries.
+    """
+
+    def __init__(self, root, max_bytes=DEFAULT_MAX_MIB << 20):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.entries = self.root / 'entries'
+        self.entries.mkdir(parents=True, exist_ok=True)
+
+
+    def key(self, runner, instance_path, *options):
+        digest = hashlib.sha256(json.dumps([FORMAT_VERSION, runner, *options]).encode())
+        with instance_path.open('rb') as f:
+            while chunk := f.read(1 << 20):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+
+    @contextmanager
+    def locked(self):
+        # Runs of the batch runner share one store
+        with (self.root / 'lock').open('w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+
+    def fetch(self, key, formula_path, proof_path):
+        """Links a cached formula and proof into place and returns their summary, or None."""
+        entry = self.entries / key
+        with self.locked():
+            if not (entry / 'summary.json').exists():
+                self.count('misses')
+                return None
+            link(entry / 'formula', formula_path)
+            link(entry / 'proof', proof_path)
+            os.utime(entry / 'summary.json')
+            self.count('hits')
+            return json.loads((entry / 'summary.json').read_text())
+
+
+    def store(self, key, formula_path, proof_path, summary):
+        entry = self.entries / key
+        with self.locked():
+            if entry.exists():
+                return
+            partial = self.entries / f'{key}.partial'
+            shutil.rmtree(partial, ignore_errors=True)
+            partial.mkdir()
+            link(formula_path, partial / 'formula')
+            link(proof_path, partial / 'proof')
+            (partial / 'summary.json').write_text(json.dumps(summary))
+            partial.rename(entry)
+            self.evict()
+
+
+    def evict(self):
+        entries = list()
+        for entry in self.entries.iterdir():
+            if entry.suffix == '.partial':
+                continue
+            n_bytes = sum(p.stat().st_size for p in entry.iterdir())
+            entries.append(((entry / 'summary.json').stat().st_mtime, n_bytes, entry))
+        total = sum(n_bytes for _, n_bytes, _ in entries)
+        for _, n_bytes, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry)
+            total -= n_bytes
+            self.count('evictions')
+
+
+    def count(self, event):
+        counts = self.counts()
+        counts[event] += 1
+        path = self.root / 'counts.json'
+        path.with_suffix('.tmp').write_text(json.dumps(counts))
+        path.with_suffix('.tmp').replace(path)
+
+
+    def counts(self):
+        path = self.root / 'counts.json'
+        counts = dict.fromkeys(['hits', 'misses', 'evictions'], 0)
+        if path.exists():
+            counts.update(json.loads(path.read_text()))
+        return counts
+
+
+    def report(self):
+        entries = [entry for entry in self.entries.iterdir() if entry.suffix != '.partial']
+        return {
+            **self.counts(),
+            'entries': len(entries),
+            'bytes': sum(p.stat().st_size for entry in entries for p in entry.iterdir()),
+        }
+
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Print the hit, miss and eviction counts and the size of a proof cache as JSON"
+    )
+    parser.add_argument(
+        "cache_dir", help="Cache directory, as passed to run.py --cache"
+    )
+    args = parser.parse_args()
+    print(json.dumps(ProofCache(args.cache_dir).report(), indent=2))
@@ -0,0 +1,207 @@
+import argparse
+from pathlib import Path
+import sys
+
+from prooflog.compress import open_input
+
+
+OPERATORS = {'+', '*', 'd', 's', 'w'}
+
+
+class ProofError(Exception):
+    pass
+
+
+
+def read_formula(formula_path):
+    """Returns the objective as a variable to coefficient dict, the number of constraints and the variables."""
+    objective = dict()
+    n_constraints = 0
+    variables = set()
+    with open_input(formula_path) as f:
+        for line in f:
+            if line.startswith('min:'):
+                tokens = line[len('min:'):].replace(';', ' ').split()
+                for coefficient, variable in zip(tokens[::2], tokens[1::2]):
+                    objective[variable] = objective.get(variable, 0) + int(coefficient)
+                variables.update(objective)
+            elif line.strip() and not line.startswith('*'):
+                n_constraints += 1
+                variables.update(read_variables(line.split()))
+    return objective, n_constraints, variables
+
+
+def read_variables(tokens):
+    return (token.removeprefix('~') for token in tokens if not is_number(token) and token not in ('>=', '=', ';'))
+
+
+def is_number(token):
+    return token.removeprefix('-').isdigit()
+
+
+def check_id(token, counter):
+    # Negative IDs count back from the last constraint
+    if not is_number(token):
+        raise ProofError(f'expected a constraint ID, not {token!r}')
+    n = int(token) + (counter + 1 if token.startswith('-') else 0)
+    if not 1 <= n <= counter:
+        raise ProofError(f'constraint {token} is used before it exists (last ID is {counter})')
+
+
+def check_ids(tokens, counter, variables=frozenset()):
+    # In reverse Polish notation a number is a constraint ID unless it is
+    # the multiplier or divisor consumed by the operator after it, and any
+    # other operand must be a literal of a known variable
+    for token, following in zip(tokens, tokens[1:] + ['']):
+        if token in OPERATORS:
+            continue
+        if following in ('*', 'd'):
+            if not token.isdigit():
+                raise ProofError(f'expected a multiplier or divisor, not {token!r}')
+        elif is_number(token) or token.removeprefix('~') not in variables:
+            check_id(token, counter)
+
+
+def assignment_value(literals, objective):
+    value = 0
+    assigned = set()
+    for literal in literals:
+        variable = literal.removeprefix('~')
+        if variable in assigned:
+            raise ProofError(f'{variable} is assigned twice')
+        assigned.add(variable)
+        if literal == variable:
+            value += objective.get(variable, 0)
+    missing = objective.keys() - assigned
+    if missing:
+        raise ProofError(f'assignment leaves {len(missing)} objective variables unset, such as {min(missing)}')
+    return value
+
+
+def check_conclusion(tokens, counter, objective, best):
+    # conclusion BOUNDS <lb> : <id> <ub> : <assignment> in version 1.2, and
+    # conclusion BOUNDS <lb> <ub> after the solutions logged by soli in 2.0
+    if len(tokens) == 4 and tokens[1] == 'BOUNDS':
+        lower, upper = int(tokens[2]), int(tokens[3])
+        if lower > upper:
+            raise ProofError(f'lower bound {lower} exceeds upper bound {upper}')
+        if upper != best:
+            raise ProofError(f'the best logged solution has objective value {best} but the upper bound is {upper}')
+        return lower, upper
+    if len(tokens) < 7 or tokens[1] != 'BOUNDS' or tokens[3] != ':' or tokens[6] != ':':
+        raise ProofError('expected conclusion BOUNDS <lb> : <id> <ub> : <assignment> or BOUNDS <lb> <ub>')
+    lower, upper = int(tokens[2]), int(tokens[5])
+    check_id(tokens[4], counter)
+    if lower > upper:
+        raise ProofError(f'lower bound {lower} exceeds upper bound {upper}')
+    value = assignment_value(tokens[7:], objective)
+    if value != upper:
+        raise ProofError(f'assignment has objective value {value} but the upper bound is {upper}')
+    return lower, upper
+
+
+def check_deletion(tokens, counter):
+    # del id <id>..., or del range <first> <end> without the end
+    if tokens[1:2] == ['range'] and len(tokens) == 4:
+        check_id(tokens[2], counter)
+        if not is_number(tokens[3]) or not int(tokens[2]) <= int(tokens[3]) <= counter + 1:
+            raise ProofError(f'bad range of constraints from {tokens[2]} to {tokens[3]}')
+    elif tokens[1:2] == ['id']:
+        for token in tokens[2:]:
+            check_id(token, counter)
+    else:
+        raise ProofError('expected del id <id>... or del range <first> <end>')
+
+
+def check(formula_path, proof_path):
+    """Checks in one pass that the proof is well formed for the formula.
+
+    Only references are checked: every constraint ID must exist when it is
+    used, pol may only name literals of the formula's variables or of those
+    introduced by red, the proof must count the formula's constraints, and a
+    conclusion must be met by its own assignment, or in version 2.0 by the
+    best solution logged with soli. The derivations themselves are not.
+    """
+    objective, n_constraints, variables = read_formula(formula_path)
+    bounds = None
+    best = None
+    with open_input(proof_path) as f:
+        n_line = 0
+        try:
+            n_line, header = 1, f.readline()
+            if not header.startswith('pseudo-Boolean proof version'):
+                raise ProofError('missing proof header')
+            if header.split()[-1] != '2.0':
+                # Version 2.0 has no f line, and counts the formula's constraints itself
+                n_line, tokens = 2, f.readline().split()
+                if tokens[:1] != ['f'] or len(tokens) < 2 or int(tokens[1]) != n_constraints:
+                    raise ProofError(f'expected f {n_constraints} for the formula constraints')
+            counter = n_constraints
+            ended = False
+            for n_line, line in enumerate(f, start=n_line + 1):
+                if ended:
+                    raise ProofError('lines after the end of the proof')
+                tokens = line.split()
+                rule = tokens[0] if tokens else '*'
+                if rule == 'pol':
+                    check_ids(tokens[1:], counter, variables)
+                    counter += 1
+                elif rule == 'rup':
+                    counter += 1
+                elif rule == 'red':
+                    # The witness after ; maps variables, possibly new ones, to values
+                    if ';' in tokens:
+                        variables.update(tokens[tokens.index(';') + 1::3])
+                    counter += 1
+                elif rule == 'soli':
+                    value = assignment_value(tokens[1:], objective)
+                    best = value if best is None else min(best, value)
+                    counter += 1
+                elif rule == 'del':
+                    check_deletion(tokens, counter)
+                elif rule == 'c':
+                    check_id(tokens[1] if len(tokens) > 1 else '', counter)
+                    bounds = 'infeasible'
+                elif rule == 'conclusion':
+                    bounds = check_conclusion(tokens, counter, objective, best)
+                elif rule == 'end':
+                    ended = True
+                elif not rule.startswith('*') and rule != 'output':
+                    raise ProofError(f'unknown rule {rule!r}')
+            if bounds is None:
+                raise ProofError('no conclusion or contradiction')
+        except ProofError as e:
+            raise ProofError(f'{proof_path}:{n_line}: {e}') from None
+    return {'constraints': counter, 'lines': n_line, 'bounds': bounds}
+
+
+def find_pairs(paths):
+    # A formula or a directory of formulas, each with the proof of the same name
+    for path in map(Path, paths):
+        formulas = sorted(path.glob('*.opb*')) if path.is_dir() else [path]
+        for formula_path in formulas:
+            yield formula_path, formula_path.with_name(formula_path.name.replace('.opb', '.veripb', 1))
+
+
+def main(args):
+    n_failed = 0
+    for formula_path, proof_path in find_pairs(args.paths):
+        try:
+            summary = check(formula_path, proof_path)
+            print(f'{proof_path}: ok, {summary["constraints"]} constraints, bounds {summary["bounds"]}')
+        except (ProofError, OSError, ValueError) as e:
+            n_failed += 1
+            print(e)
+    if n_failed:
+        sys.exit(f'{n_failed} proofs failed')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Quickly check that proofs only refer to existing constraints and conclude consistently"
+    )
+    parser.add_argument(
+        "paths", nargs='+', help="Formula (.opb) files or directories of them, each next to its .veripb proof"
+    )
+    args = parser.parse_args()
+    main(args)
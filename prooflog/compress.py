@@ -0,0 +1,58 @@
+import gzip
+import io
+
+
+COMPRESSIONS = ['none', 'gzip', 'zstd']
+SUFFIXES = {'none': '', 'gzip': '.gz', 'zstd': '.zst'}
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError("zstd compression needs the 'zstandard' package") from e
+    return zstandard
+
+
+def with_compression_suffix(path, compress):
+    return path.with_name(path.name + SUFFIXES[compress])
+
+
+def output_paths(instance_path, compress='none'):
+    """The formula and proof paths written next to an instance."""
+    return (
+        with_compression_suffix(instance_path.with_suffix('.opb'), compress),
+        with_compression_suffix(instance_path.with_suffix('.veripb'), compress),
+    )
+
+
+def open_output(path, compress='none', buffer_size=1 << 20):
+    """Opens path for writing text, compressing it as it is written."""
+    if compress == 'none':
+        return path.open('w', buffering=buffer_size)
+    if compress == 'gzip':
+        raw = gzip.GzipFile(path, 'wb', compresslevel=6)
+    elif compress == 'zstd':
+        raw = _zstandard().ZstdCompressor().stream_writer(path.open('wb'))
+    else:
+        raise ValueError(f'Unknown compression {compress!r}')
+    return io.TextIOWrapper(io.BufferedWriter(raw, buffer_size))
+
+
+def open_input(path):
+    """Opens a possibly compressed formula or proof for reading text.
+
+    The compression is detected from the file contents, so callers can
+    iterate over lines without knowing which mode produced the file.
+    """
+    with path.open('rb') as f:
+        magic = f.read(len(ZSTD_MAGIC))
+    if magic.startswith(GZIP_MAGIC):
+        return io.TextIOWrapper(io.BufferedReader(gzip.GzipFile(path, 'rb')))
+    if magic == ZSTD_MAGIC:
+        raw = _zstandard().ZstdDecompressor().stream_reader(path.open('rb'))
+        return io.TextIOWrapper(io.BufferedReader(raw))
+    return path.open()
@@ -0,0 +1,30 @@
+import argparse
+from pathlib import Path
+
+from prooflog.instances import write_instance
+from prooflog.runners import RUNNERS, load_runner
+
+
+def convert(kind, text_path, binary_path):
+    parsed = load_runner(kind).parse_instance(text_path)
+    # The DAG and knapsack parsers also return the number of vertices or the capacity
+    size, rows = parsed if kind in ('dag', 'knapsack') else (len(parsed), parsed)
+    write_instance(binary_path, kind, size, rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Convert a text instance to the binary instance format"
+    )
+    parser.add_argument(
+        "runner", choices=list(RUNNERS), help="Which kind of instance to convert"
+    )
+    parser.add_argument(
+        "text_path", help="Text instance path"
+    )
+    parser.add_argument(
+        "binary_path", nargs='?', help="Output path, by default the text path with a .bin suffix"
+    )
+    args = parser.parse_args()
+    text_path = Path(args.text_path)
+    convert(args.runner, text_path, Path(args.binary_path) if args.binary_path else text_path.with_suffix('.bin'))
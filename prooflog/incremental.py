@@ -0,0 +1,152 @@
+import json
+import mmap
+import os
+
+from prooflog.writer import write_all
+
+
+STATE_VERSION = 2
+
+
+def state_path(proof_path):
+    return proof_path.with_name(proof_path.name + '.state')
+
+
+def shift_pol(line, shift):
+    # Constraint IDs move by shift, while multipliers and divisors stay
+    tokens = line.split(' ')
+    for ix, (token, following) in enumerate(zip(tokens, tokens[1:] + [''])):
+        if ix > 0 and token.isdigit() and following not in ('*', 'd'):
+            tokens[ix] = str(int(token) + shift)
+    return ' '.join(tokens)
+
+
+class ProofState:
+    """What a DP proof was made from, and where each of its blocks lies.
+
+    A block is the run of lines justifying one subproblem. It only refers
+    to constraints derived inside it, and all of its red lines come before
+    its pol lines. ``blocks`` maps each subproblem to its
+    byte range in the proof, the constraint counter before it, how many
+    constraints it derives and the DP values it produced. Saved next to the
+    proof, this lets a run on an extended instance copy the blocks whose
+    inputs did not change instead of deriving them again.
+    """
+
+    def __init__(self, runner, rows):
+        self.runner = runner
+        self.rows = rows
+        self.blocks = dict()
+
+
+    def record(self, key, start, end, base, n_constraints, values):
+        self.blocks[key] = (start, end, base, n_constraints, values)
+
+
+    def save(self, path, proof_path):
+        proof = proof_path.stat()
+        with path.open('w') as f:
+            json.dump({
+                'version': STATE_VERSION,
+                'runner': self.runner,
+                'proof': [proof.st_size, proof.st_mtime_ns],
+                'rows': self.rows,
+                'blocks': list(self.blocks.items()),
+            }, f)
+
+
+    @classmethod
+    def load(cls, path, proof_path, runner):
+        """The state saved for proof_path, or None if it is missing or describes another proof."""
+        try:
+            with path.open() as f:
+                saved = json.load(f)
+            proof = proof_path.stat()
+        except FileNotFoundError:
+            return None
+        if saved['version'] != STATE_VERSION or saved['runner'] != runner or \
+                saved['proof'] != [proof.st_size, proof.st_mtime_ns]:
+            return None
+        state = cls(runner, [tuple(row) for row in saved['rows']])
+        state.blocks = {key: tuple(block) for key, block in saved['blocks']}
+        return state
+
+
+
+class BlockCopier:
+    """Copies blocks of a previous proof into a new one.
+
+    The previous proof is opened straight away, so it can still be read
+    after its path is reused for the new proof. The coefficients of a block,
+    big-M ones included, only depend on what it was made from, so only the
+    constraint IDs in its short pol lines are rewritten; the bytes before
+    them are copied by the kernel where it can.
+    """
+
+    def __init__(self, state, proof_path):
+        self.state = state
+        self.file = proof_path.open('rb')
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.kernel_copy = hasattr(os, 'copy_file_range')
+
+
+    def copy(self, key, writer):
+        """Writes the block for key at the current point, returning its ID shift and DP values."""
+        start, end, base, n_constraints, values = self.state.blocks[key]
+        shift = writer.counter - base
+        pieces = self.pieces(start, end, shift)
+        if writer.stats is None:
+            fd = writer.flush_to_fd()
+            for piece in pieces:
+                if isinstance(piece, bytes):
+                    write_all(fd, piece)
+                else:
+                    self.copy_range(fd, *piece)
+            writer.resync(n_constraints)
+        else:
+            text = b''.join(piece if isinstance(piece, bytes) else self.data[slice(*piece)] for piece in pieces)
+            writer.write_block(text.decode(), n_constraints)
+        return shift, values
+
+
+    def pieces(self, start, end, shift):
+        # The block as a (start, end) range of the old proof and replacement
+        # bytes. Its red lines come first and are long, and only the short
+        # lines after the last of them are looked at one by one.
+        data = self.data
+        last_red = data.rfind(b'\nred ', start - 1, end)
+        tail = data.find(b'\n', last_red + 1, end) + 1 if last_red != -1 else start
+        lines = data[tail:end].decode().split('\n')
+        for ix, line in enumerate(lines):
+            if line.startswith('pol '):
+                lines[ix] = shift_pol(line, shift)
+        return [(start, tail), '\n'.join(lines).encode()]
+
+
+    def copy_range(self, fd, start, end):
+        while start < end:
+            if self.kernel_copy:
+                try:
+                    copied = os.copy_file_range(self.file.fileno(), fd, end - start, start)
+                except OSError:
+                    # Not supported between these files
+                    self.kernel_copy = False
+                    continue
+                if not copied:
+                    raise ValueError('The previous proof is shorter than its saved state')
+                start += copied
+                continue
+            write_all(fd, self.data[start:end])
+            start = end
+
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+
+
+def open_previous(proof_path, runner):
+    """A copier for the blocks of the proof at proof_path, or None if it has no usable state."""
+    state = ProofState.load(state_path(proof_path), proof_path, runner)
+    return BlockCopier(state, proof_path) if state is not None else None
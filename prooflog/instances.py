@@ -0,0 +1,113 @@
+from array import array
+from collections.abc import Sequence
+from itertools import islice
+import mmap
+import struct
+import sys
+
+
+# A binary instance is a header followed by little-endian int64 columns of
+# n_rows entries each: source, target and weight of every edge for a DAG
+# (sorted by source), start, finish and weight of every interval, or weight
+# and profit of every knapsack item. The size field is the number of
+# vertices, of intervals, or the knapsack capacity.
+MAGIC = b'PLI1'
+HEADER = struct.Struct('<4s4sqq')
+KINDS = {
+    'dag': b'dag\0',
+    'interval-scheduling': b'int\0',
+    'knapsack': b'knp\0',
+}
+COLUMNS = {
+    'dag': 3,
+    'interval-scheduling': 3,
+    'knapsack': 2,
+}
+# Lines of text instances are joined and written this many at a time
+CHUNK_SIZE = 1 << 16
+
+
+class Rows(Sequence):
+    """Read-only rows over equal-length columns, made into tuples on access."""
+
+    def __init__(self, *columns):
+        self.columns = columns
+
+
+    def __len__(self):
+        return len(self.columns[0])
+
+
+    def __getitem__(self, ix):
+        return tuple(column[ix] for column in self.columns)
+
+
+    def __iter__(self):
+        return zip(*self.columns)
+
+
+
+def as_columns(rows):
+    """The three columns of rows as int64 sequences.
+
+    The mapped columns of a binary instance are returned as they are, and
+    other rows are copied into arrays.
+    """
+    if isinstance(rows, Rows):
+        return rows.columns
+    return [array('q', [row[ix] for row in rows]) for ix in range(3)]
+
+
+def is_binary_instance(path):
+    with path.open('rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def write_text_instance(path, size, rows):
+    rows = iter(rows)
+    with path.open('w') as f:
+        f.write(f'{size}\n')
+        while lines := [f'{a} {b} {c}\n' for a, b, c in islice(rows, CHUNK_SIZE)]:
+            f.write(''.join(lines))
+
+
+def write_instance(path, kind, size, rows):
+    columns = [array('q') for _ in range(COLUMNS[kind])]
+    for row in rows:
+        for column, x in zip(columns, row):
+            column.append(x)
+    if sys.byteorder == 'big':
+        for column in columns:
+            column.byteswap()
+    with path.open('wb') as f:
+        f.write(HEADER.pack(MAGIC, KINDS[kind], size, len(columns[0])))
+        for column in columns:
+            column.tofile(f)
+
+
+def read_instance(path, kind):
+    """Maps a binary instance into memory, returning its size and rows.
+
+    The columns are views of the mapped file, so no per-element objects
+    are created until rows are read.
+    """
+    with path.open('rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(data) < HEADER.size:
+        raise ValueError(f'{path} is too short for a binary instance')
+    magic, tag, size, n_rows = HEADER.unpack_from(data)
+    if magic != MAGIC or tag != KINDS[kind]:
+        raise ValueError(f'{path} is not a binary {kind} instance')
+    n_columns = COLUMNS[kind]
+    if len(data) != HEADER.size + n_columns * 8 * n_rows:
+        raise ValueError(f'{path} should hold {n_rows} rows but has {len(data) - HEADER.size} bytes of data')
+    if sys.byteorder == 'big':
+        columns = list()
+        for ix in range(n_columns):
+            column = array('q', data[HEADER.size + 8 * n_rows * ix:HEADER.size + 8 * n_rows * (ix + 1)])
+            column.byteswap()
+            columns.append(column)
+    else:
+        view = memoryview(data)[HEADER.size:].cast('q')
+        columns = [view[n_rows * ix:n_rows * (ix + 1)] for ix in range(n_columns)]
+    return size, Rows(*columns)
@@ -0,0 +1,70 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
+import multiprocessing
+from pathlib import Path
+import tempfile
+
+from prooflog.writer import ProofWriter
+
+
+# Chunks per worker, so that a worker finishing early can take another
+CHUNKS_PER_WORKER = 4
+
+# What renders a chunk, set before the workers are forked so that they
+# inherit it along with the DP state it reads
+_render = None
+
+
+def split(costs, n_chunks):
+    """Cuts range(len(costs)) into at most n_chunks contiguous (lo, hi) ranges of about equal cost."""
+    total = sum(costs)
+    cuts = [0]
+    running = 0
+    for ix, cost in enumerate(costs[:-1]):
+        running += cost
+        if running * n_chunks >= total * len(cuts):
+            cuts.append(ix + 1)
+    cuts.append(len(costs))
+    return list(zip(cuts, cuts[1:]))
+
+
+def render_chunk(path, lo, hi, counter):
+    with ProofWriter(path, counter) as writer:
+        results = _render(writer, lo, hi)
+    return writer.counter, results
+
+
+def render_parallel(writer, render, n_constraints, costs, workers):
+    """Writes the proof blocks for a run of items in worker processes.
+
+    Item i derives n_constraints[i] constraints, so the first ID of every
+    block is known before any is written. Contiguous chunks of items are
+    cut to about equal total cost, and ``render(chunk_writer, lo, hi)``
+    writes the blocks for items lo to hi - 1 of a chunk to a file of its
+    own, returning a result for each item. Workers are forked, so render
+    sees the state of the caller. The files are appended to writer in
+    order, and the results are returned in order.
+    """
+    global _render
+    starts = list(accumulate(n_constraints, initial=writer.counter))
+    chunks = split(costs, workers * CHUNKS_PER_WORKER)
+    # Nothing buffered may be written again by a forked worker
+    writer.file.flush()
+    _render = render
+    results = list()
+    try:
+        with tempfile.TemporaryDirectory(prefix='chunks-', dir=Path(writer.path).parent) as directory, \
+                ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('fork')) as pool:
+            paths = [Path(directory) / f'{ix}.veripb' for ix in range(len(chunks))]
+            futures = [pool.submit(render_chunk, path, lo, hi, starts[lo]) for path, (lo, hi) in zip(paths, chunks)]
+            for path, (lo, hi), future in zip(paths, chunks, futures):
+                counter, chunk_results = future.result()
+                if counter != starts[hi]:
+                    raise ValueError(f'Items {lo} to {hi - 1} derived {counter - starts[lo]} constraints, '
+                                     f'but {starts[hi] - starts[lo]} were expected')
+                writer.append_file(path, counter - starts[lo])
+                path.unlink()
+                results.extend(chunk_results)
+    finally:
+        _render = None
+    return results
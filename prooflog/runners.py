@@ -0,0 +1,164 @@
+from functools import cache, partial
+import importlib.util
+import json
+from pathlib import Path
+import sys
+
+from prooflog.cache import DEFAULT_MAX_MIB, ProofCache
+from prooflog.compress import COMPRESSIONS, output_paths
+from prooflog.incremental import open_previous, state_path
+from prooflog.stats import Stats
+from prooflog.verify import DEFAULT_COMMAND, Verifier
+
+
+ROOT = Path(__file__).resolve().parent.parent
+RUNNERS = {
+    'dag': ROOT / 'dag' / 'run.py',
+    'interval-scheduling': ROOT / 'interval-scheduling' / 'run.py',
+    'knapsack': ROOT / 'knapsack' / 'run.py',
+}
+
+
+@cache
+def load_runner(name):
+    """Imports one of the run.py scripts as a module."""
+    spec = importlib.util.spec_from_file_location(f'{name.replace("-", "_")}_run', RUNNERS[name])
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def add_arguments(parser, solution, prefix_sums=True, incremental=True, workers=True):
+    """Adds the options that the runners share to parser.
+
+    solution names what --solve-only prints with the optimum. Runners
+    without prefix-sum, incremental or parallel proofs leave those options
+    out. Every option is stored under the name of its keyword argument to
+    main, so that a runner can call main(**vars(args)).
+    """
+    parser.add_argument(
+        'instance_path', type=Path, help='Instance path'
+    )
+    parser.add_argument(
+        '--compress', choices=COMPRESSIONS, default='none', help='Compression for the formula and proof files'
+    )
+    if prefix_sums:
+        parser.add_argument(
+            '--prefix-sums', action='store_true', help='Derive the bound by accumulating prefix constraints, for a linear-size proof'
+        )
+    parser.add_argument(
+        '--stats', dest='stats_path', metavar='PATH', type=Path, help='Write phase timings, peak memory and per-rule proof sizes as JSON'
+    )
+    parser.add_argument(
+        '--verify', metavar='COMMAND', nargs='?', const=DEFAULT_COMMAND,
+        help=f'Stream the proof into COMMAND instead of writing it, with {{formula}} replaced by the formula path (default: {DEFAULT_COMMAND})'
+    )
+    parser.add_argument(
+        '--cache', dest='cache_dir', metavar='DIR', help='Reuse the formula and proof from this cache when the instance was seen before'
+    )
+    parser.add_argument(
+        '--cache-size', dest='cache_mib', metavar='MIB', type=int, default=DEFAULT_MAX_MIB,
+        help='Evict least recently used cache entries beyond this size'
+    )
+    if incremental:
+        parser.add_argument(
+            '--incremental', action='store_true',
+            help="Save the DP state with the proof, and copy the unchanged parts of the previous proof's when there is one"
+        )
+        parser.add_argument(
+            '--base', dest='base_path', metavar='INSTANCE', type=Path,
+            help='With --incremental, copy from the proof of this instance rather than from the previous proof of this one'
+        )
+    parser.add_argument(
+        '--solve-only', action='store_true',
+        help=f'Only find the optimum and print it with {solution} as JSON, without writing a formula or proof'
+    )
+    if workers:
+        parser.add_argument(
+            '--workers', metavar='N', type=int, default=1, help='Write the dynamic programming proof in chunks across N processes'
+        )
+
+
+def report(args, summary):
+    """Prints the summary for --solve-only, and exits with the status of the --verify command."""
+    if args.solve_only:
+        print(json.dumps(summary))
+    if args.verify is not None:
+        print(f"verifier exited with status {summary['verifier_status']} after {summary['verifier_seconds']:.3f}s", file=sys.stderr)
+        sys.exit(summary['verifier_status'])
+
+
+def with_stats(stats_path, run):
+    """Returns run(stats), dumping the stats to stats_path afterwards, or passing None without one."""
+    stats = Stats() if stats_path is not None else None
+    summary = run(stats)
+    if stats is not None:
+        stats.dump(stats_path)
+    return summary
+
+
+def prepare_dirs(formula_path, proof_path):
+    formula_path.unlink(missing_ok=True)
+    proof_path.unlink(missing_ok=True)
+    state_path(proof_path).unlink(missing_ok=True)
+
+
+def run_main(runner, instance_path, solve, write, cache_options=(), *, compress='none', stats_path=None, verify=None,
+             cache_dir=None, cache_mib=DEFAULT_MAX_MIB, incremental=False, base_path=None, solve_only=False):
+    """The part of main that the runners share, returning the summary of the run.
+
+    With solve_only the summary is solve(instance_path, stats). Otherwise
+    the formula and proof are fetched from the cache, under a key made of
+    the runner, the instance, compress and cache_options, or written by
+    write(formula_path, proof_path, stats, verifier, previous). That parses
+    the instance and writes the formula, returning the size of the instance
+    and a proof manager whose run() writes the proof and returns the
+    optimum, and whose state is saved when incremental.
+    """
+    if incremental and (compress != 'none' or verify is not None):
+        raise ValueError('Incremental proofs must be uncompressed and written to disk')
+    if solve_only:
+        return with_stats(stats_path, partial(solve, instance_path))
+    return with_stats(stats_path, partial(
+        prove, runner, instance_path, write, cache_options, compress, verify, cache_dir, cache_mib, incremental, base_path
+    ))
+
+
+def prove(runner, instance_path, write, cache_options, compress, verify, cache_dir, cache_mib, incremental, base_path, stats):
+    formula_path, proof_path = output_paths(instance_path, compress)
+    verifier = Verifier(verify, formula_path) if verify is not None else None
+    # Opened before the outputs are replaced, as the base may be this instance
+    previous = open_previous(output_paths(base_path or instance_path)[1], runner) if incremental else None
+    # A streamed proof never reaches the disk, so there is nothing to cache
+    cache = ProofCache(cache_dir, cache_mib << 20) if cache_dir is not None and verifier is None else None
+    if cache is not None:
+        key = cache.key(runner, instance_path, compress, *cache_options)
+        summary = cache.fetch(key, formula_path, proof_path)
+        if stats is not None:
+            stats.record_cache('miss' if summary is None else 'hit')
+        if summary is not None:
+            if previous is not None:
+                previous.close()
+            if stats is not None:
+                stats.record_outputs(formula_path, proof_path)
+            return {**summary, 'cache': 'hit'}
+    prepare_dirs(formula_path, proof_path)
+    size, manager = write(formula_path, proof_path, stats, verifier, previous)
+    try:
+        optimum = manager.run()
+    except BrokenPipeError:
+        # The verifier stopped reading early, and has been waited for
+        optimum = None
+    if incremental:
+        manager.state.save(state_path(proof_path), proof_path)
+    if previous is not None:
+        previous.close()
+    if stats is not None:
+        stats.record_outputs(formula_path, proof_path)
+    summary = {'size': size, 'optimum': optimum}
+    if verifier is not None:
+        summary.update(verifier_status=verifier.returncode, verifier_seconds=verifier.seconds)
+    if cache is not None:
+        cache.store(key, formula_path, proof_path, summary)
+        summary['cache'] = 'miss'
+    return summary
@@ -0,0 +1,75 @@
+from contextlib import contextmanager, nullcontext
+import json
+import resource
+import time
+
+
+class Stats:
+    """Opt-in measurements of one run, dumped as JSON.
+
+    Records wall time and peak resident memory at the end of each phase,
+    how many lines and bytes of each proof rule were written, how often
+    dynamic programming subproblems were reused, and whether the outputs
+    came from the proof cache.
+    """
+
+    def __init__(self):
+        self.phases = dict()
+        self.rules = dict()
+        self.memo = dict()
+        self.outputs = dict()
+        self.cache = None
+
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = {
+                'seconds': time.perf_counter() - start,
+                'peak_rss_kib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            }
+
+
+    def count_line(self, rule, n_bytes):
+        counts = self.rules.setdefault(rule, {'lines': 0, 'bytes': 0})
+        counts['lines'] += 1
+        counts['bytes'] += n_bytes
+
+
+    def record_memo(self, calls, misses):
+        # As if every subproblem request went through a cache
+        self.memo = {
+            'calls': calls,
+            'hits': calls - misses,
+            'hit_rate': (calls - misses) / calls if calls else 0.0,
+        }
+
+
+    def record_outputs(self, *paths):
+        self.outputs = {path.name: path.stat().st_size for path in paths if path.exists()}
+
+
+    def record_cache(self, result):
+        # 'hit' or 'miss', left None when no cache is used
+        self.cache = result
+
+
+    def dump(self, path):
+        with path.open('w') as f:
+            json.dump({
+                'phases': self.phases,
+                'rules': self.rules,
+                'memo': self.memo,
+                'outputs': self.outputs,
+                'cache': self.cache,
+            }, f, indent=2)
+            f.write('\n')
+
+
+
+def phase(stats, name):
+    """Times a phase into stats, or does nothing if stats is None."""
+    return stats.phase(name) if stats is not None else nullcontext()
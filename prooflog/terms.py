@@ -0,0 +1,74 @@
+import itertools
+
+
+class TermTable:
+    """Objective terms rendered once per instance.
+
+    ``positive[i]`` and ``negative[i]`` hold ``'{w} {name}'`` and
+    ``'{-w} {name}'`` for the i-th term. Proof lines are assembled from
+    these strings, or from runs of them joined by ``prefix`` and
+    ``select``, rather than formatting every term again. ``prefix_range``
+    and ``select_range`` give the least and greatest values the same runs
+    can take, for choosing big-M coefficients.
+    """
+
+    def __init__(self, weights, names):
+        self.weights = list(weights)
+        self.positive = [f'{w} {name}' for w, name in zip(weights, names)]
+        self.negative = [f'{-w} {name}' for w, name in zip(weights, names)]
+        self.joined = {False: ' '.join(self.positive), True: ' '.join(self.negative)}
+        # Where the first i terms end in the joined strings
+        self.ends = {
+            negated: [0, *itertools.accumulate(len(term) + 1 for term in terms)]
+            for negated, terms in [(False, self.positive), (True, self.negative)]
+        }
+        # Sums of the negative and of the positive weights among the first i terms
+        self.lows = [0, *itertools.accumulate(min(w, 0) for w in self.weights)]
+        self.highs = [0, *itertools.accumulate(max(w, 0) for w in self.weights)]
+
+
+    def prefix(self, count, negated=False):
+        """The first count terms joined, as a tuple of at most one string.
+
+        The tuple is empty when count is zero, so that it can be splatted
+        into a proof line without leaving a doubled space.
+        """
+        if count == 0:
+            return ()
+        return (self.joined[negated][:self.ends[negated][count] - 1],)
+
+
+    def select(self, indices, negated=False):
+        """The terms at indices joined, as a tuple like ``prefix``."""
+        terms = self.negative if negated else self.positive
+        joined = ' '.join([terms[i] for i in indices])
+        return (joined,) if joined else ()
+
+
+    def prefix_range(self, count):
+        """The least and greatest values of the first count terms, unnegated."""
+        return self.lows[count], self.highs[count]
+
+
+    def select_range(self, indices):
+        """The least and greatest values of the terms at indices, unnegated."""
+        weights = [self.weights[i] for i in indices]
+        return sum(w for w in weights if w < 0), sum(w for w in weights if w > 0)
+
+
+
+def accumulate(bound, terms):
+    # Reverse Polish tokens for pol that add each of terms onto bound
+    if bound is None:
+        bound, *terms = terms
+    return [f'{bound}', *[f'{term} +' for term in terms]]
+
+
+def tight_big_m(degree, least):
+    """The smallest coefficient that lets a literal satisfy a constraint alone.
+
+    The rest of the constraint is at least least, so with the literal true
+    it holds whatever the other variables are. The result is at least 1,
+    so that the literal keeps a coefficient.
+    """
+    return max(1, degree - least)
@@ -0,0 +1,36 @@
+import io
+import shlex
+import subprocess
+import time
+
+
+DEFAULT_COMMAND = 'veripb {formula} /dev/stdin'
+
+
+class Verifier:
+    """A checker process that reads the proof on its standard input.
+
+    ``{formula}`` in the command is replaced by the formula path. Writes go
+    through a buffer of bounded size into the pipe, so a slow checker makes
+    proof generation wait rather than letting lines pile up in memory.
+    """
+
+    def __init__(self, command, formula_path):
+        self.args = [arg.format(formula=formula_path) for arg in shlex.split(command)]
+        self.process = None
+        self.returncode = None
+        self.seconds = None
+
+
+    def start(self, buffer_size=1 << 20):
+        self.start_time = time.perf_counter()
+        self.process = subprocess.Popen(self.args, stdin=subprocess.PIPE, bufsize=0)
+        return io.TextIOWrapper(io.BufferedWriter(self.process.stdin, buffer_size))
+
+
+    def finish(self):
+        # The proof file has been closed, or the checker stopped reading early
+        if self.returncode is None:
+            self.returncode = self.process.wait()
+            self.seconds = time.perf_counter() - self.start_time
+        return self.returncode
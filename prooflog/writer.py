@@ -0,0 +1,136 @@
+import os
+import shutil
+
+from prooflog.compress import open_output
+
+
+class ProofWriter:
+    """Keeps the proof file open and buffers lines until it is closed.
+
+    Numbering follows the proof format: every line written with
+    ``is_constraint=True`` gets the next constraint ID, which is returned.
+    Given a verifier, lines are streamed to it instead of written to path.
+    """
+
+    def __init__(self, path, counter=0, compress='none', buffer_size=1 << 20, stats=None, verifier=None):
+        self.path = path
+        self.counter = counter
+        self.compress = compress
+        self.stats = stats
+        self.verifier = verifier
+        if verifier is not None:
+            self.file = verifier.start(buffer_size)
+        else:
+            self.file = open_output(path, compress, buffer_size)
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+    def write_line(self, *line, is_constraint=True):
+        text = ' '.join(line) + '\n'
+        self.file.write(text)
+        if self.stats is not None:
+            self.stats.count_line(line[0].split(' ', 1)[0], len(text))
+        if is_constraint:
+            self.counter += 1
+            return self.counter
+
+
+    def write_block(self, text, n_constraints):
+        """Writes lines that already carry the right constraint IDs."""
+        self.file.write(text)
+        if self.stats is not None:
+            for line in text.splitlines():
+                self.stats.count_line(line.split(' ', 1)[0], len(line) + 1)
+        self.counter += n_constraints
+
+
+    def append_file(self, path, n_constraints, size=None):
+        """Appends a file of lines that already carry the right constraint IDs.
+
+        Given a size, only that many bytes from the start of the file are
+        appended, which must end at the end of a line.
+        """
+        self.file.flush()
+        with open(path, 'rb') as f:
+            if self.stats is not None:
+                position = 0
+                for line in f:
+                    position += len(line)
+                    if size is not None and position > size:
+                        break
+                    self.stats.count_line(line.split(b' ', 1)[0].rstrip(b'\n').decode(), len(line))
+                f.seek(0)
+            if self.compress == 'none' and self.verifier is None:
+                copy_file(f, self.file.fileno(), size)
+                self.file.seek(0, os.SEEK_END)
+            elif size is None:
+                shutil.copyfileobj(f, self.file.buffer, 1 << 20)
+            else:
+                while size and (chunk := f.read(min(size, 1 << 20))):
+                    self.file.buffer.write(chunk)
+                    size -= len(chunk)
+        self.counter += n_constraints
+
+
+    def flush_to_fd(self):
+        """Flushes the buffered lines and returns the file descriptor.
+
+        Bytes written to it directly must be followed by ``resync``.
+        """
+        self.file.flush()
+        return self.file.fileno()
+
+
+    def resync(self, n_constraints):
+        self.file.seek(0, os.SEEK_END)
+        self.counter += n_constraints
+
+
+    def tell(self):
+        return self.file.tell()
+
+
+    def close(self):
+        if not self.file.closed:
+            try:
+                self.file.close()
+            except BrokenPipeError:
+                # The verifier exited before reading everything; its status says why
+                pass
+        if self.verifier is not None:
+            self.verifier.finish()
+
+
+
+def copy_file(source, fd, size=None):
+    # The first size bytes of source, or all of it, in the kernel where it
+    # can, which file systems with reflinks turn into sharing extents rather
+    # than copying them
+    if size is None:
+        size = os.fstat(source.fileno()).st_size
+    offset = 0
+    try:
+        while offset < size:
+            copied = os.copy_file_range(source.fileno(), fd, size - offset, offset)
+            if not copied:
+                break
+            offset += copied
+    except (AttributeError, OSError):
+        # No copy_file_range, or not between these files
+        pass
+    source.seek(offset)
+    while offset < size and (chunk := source.read(min(size - offset, 1 << 20))):
+        write_all(fd, chunk)
+        offset += len(chunk)
+
+
+def write_all(fd, data):
+    while data:
+        data = data[os.write(fd, data):]
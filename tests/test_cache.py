@@ -0,0 +1,32 @@
+import json
+from pathlib import Path
+import sys
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from prooflog.runners import load_runner
+
+
+INSTANCES = {
+    'dag': '4\n0 1 2\n0 2 5\n1 2 -1\n1 3 4\n2 3 3\n',
+    'interval-scheduling': '3\n0 4 3\n2 6 5\n5 9 4\n',
+    'knapsack': '3 7\n3 4\n4 5\n2 3\n',
+}
+
+
+@pytest.mark.parametrize('runner', list(INSTANCES))
+def test_hit_writes_stats(runner, tmp_path):
+    instance_path = tmp_path / 'tiny.txt'
+    instance_path.write_text(INSTANCES[runner])
+    main = load_runner(runner).main
+    results = list()
+    for attempt in ['miss', 'hit']:
+        stats_path = tmp_path / f'{attempt}.json'
+        summary = main(instance_path, stats_path=stats_path, cache_dir=tmp_path / 'cache')
+        assert summary['cache'] == attempt
+        results.append(json.loads(stats_path.read_text()))
+    miss, hit = results
+    assert miss['cache'] == 'miss' and hit['cache'] == 'hit'
+    assert hit['outputs'] == miss['outputs']
+    assert 'generate_formula' in miss['phases'] and not hit['phases']
@@ -0,0 +1,86 @@
+from pathlib import Path
+import sys
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from prooflog.check import ProofError, check
+
+
+FORMULA = '''* #variable= 2 #constraint= 1
+min: 1 x1 1 x2 ;
+1 x1 1 x2 >= 1 ;
+'''
+
+
+def write_pair(tmp_path, *lines, version='1.2'):
+    formula_path = tmp_path / 'tiny.opb'
+    proof_path = tmp_path / 'tiny.veripb'
+    formula_path.write_text(FORMULA)
+    start = ['pseudo-Boolean proof version 1.2', 'f 1'] if version == '1.2' else ['pseudo-Boolean proof version 2.0']
+    proof_path.write_text('\n'.join([*start, *lines]) + '\n')
+    return formula_path, proof_path
+
+
+def test_well_formed_proof_passes(tmp_path):
+    formula_path, proof_path = write_pair(
+        tmp_path,
+        'pol 1 x1 +',
+        'pol -1 ~x2 2 * +',
+        'red 1 y >= 1 ; y -> 1',
+        'pol 3 y +',
+        'conclusion BOUNDS 1 : 1 1 : x1 ~x2',
+        'end pseudo-Boolean proof',
+    )
+    assert check(formula_path, proof_path)['bounds'] == (1, 1)
+
+
+@pytest.mark.parametrize('line', [
+    'pol 1 None 3 * +',
+    'pol 1 2 +',
+    'pol 1 y +',
+    'pol 1 x1 k *',
+])
+def test_bad_pol_operand_fails(tmp_path, line):
+    formula_path, proof_path = write_pair(tmp_path, line, 'conclusion BOUNDS 1 : 1 1 : x1 ~x2')
+    with pytest.raises(ProofError):
+        check(formula_path, proof_path)
+
+
+@pytest.mark.parametrize('bound', ['None', '2', '0', 'x1'])
+def test_conclusion_needs_existing_id(tmp_path, bound):
+    formula_path, proof_path = write_pair(tmp_path, f'conclusion BOUNDS 1 : {bound} 1 : x1 ~x2')
+    with pytest.raises(ProofError):
+        check(formula_path, proof_path)
+
+
+def test_contradiction_needs_existing_id(tmp_path):
+    formula_path, proof_path = write_pair(tmp_path, 'c None')
+    with pytest.raises(ProofError):
+        check(formula_path, proof_path)
+
+
+def test_version_2_proof_passes(tmp_path):
+    formula_path, proof_path = write_pair(
+        tmp_path,
+        'rup 1 x1 1 x2 >= 1 ;',
+        'soli x1 ~x2',
+        'del range 2 3',
+        'pol -1 1 +',
+        'conclusion BOUNDS 1 1',
+        'end pseudo-Boolean proof',
+        version='2.0',
+    )
+    assert check(formula_path, proof_path)['bounds'] == (1, 1)
+
+
+@pytest.mark.parametrize('lines', [
+    ['conclusion BOUNDS 1 1'],
+    ['soli x1 x2', 'conclusion BOUNDS 1 1'],
+    ['soli x1 ~x2', 'del range 1 4', 'conclusion BOUNDS 1 1'],
+    ['soli x1 ~x2', 'del id None', 'conclusion BOUNDS 1 1'],
+])
+def test_bad_version_2_proof_fails(tmp_path, lines):
+    formula_path, proof_path = write_pair(tmp_path, *lines, version='2.0')
+    with pytest.raises(ProofError):
+        check(formula_path, proof_path)
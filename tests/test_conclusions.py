@@ -0,0 +1,95 @@
+from itertools import combinations
+from pathlib import Path
+import random
+import sys
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from prooflog import output_paths
+from prooflog.check import check
+from prooflog.runners import load_runner
+
+
+SEEDS = range(16)
+
+
+def random_dag(rng):
+    n = rng.randint(2, 7)
+    edges = [(u, v, rng.randint(-5, 9)) for u, v in combinations(range(n), 2) if rng.random() < 0.6]
+    return n, edges, f'{n}\n' + ''.join(f'{u} {v} {w}\n' for u, v, w in edges)
+
+
+def random_intervals(rng):
+    intervals = list()
+    for _ in range(rng.randint(1, 7)):
+        start = rng.randint(0, 10)
+        intervals.append((start, start + rng.randint(1, 5), rng.randint(-2, 9)))
+    return intervals, f'{len(intervals)}\n' + ''.join(f'{s} {f} {w}\n' for s, f, w in intervals)
+
+
+def random_knapsack(rng):
+    items = [(rng.randint(1, 6), rng.randint(0, 8)) for _ in range(rng.randint(0, 6))]
+    capacity = rng.randint(0, 15)
+    return capacity, items, f'{len(items)} {capacity}\n' + ''.join(f'{w} {p}\n' for w, p in items)
+
+
+def shortest_path(n, edges, v=0):
+    # By trying every path, or None if there is none to the last vertex
+    if v == n - 1:
+        return 0
+    lengths = [w + rest for u, t, w in edges if u == v and (rest := shortest_path(n, edges, t)) is not None]
+    return min(lengths, default=None)
+
+
+def subsets(items):
+    return (subset for size in range(len(items) + 1) for subset in combinations(items, size))
+
+
+def best_schedule(intervals):
+    return -max(
+        sum(w for _, _, w in subset)
+        for subset in subsets(intervals)
+        if all(max(a[0], b[0]) >= min(a[1], b[1]) for a, b in combinations(subset, 2))
+    )
+
+
+def best_packing(capacity, items):
+    return -max(sum(p for _, p in subset) for subset in subsets(items) if sum(w for w, _ in subset) <= capacity)
+
+
+def prove(runner, tmp_path, text, **options):
+    """The optimum from solve, after checking that the proof concludes with it."""
+    instance_path = tmp_path / 'instance.txt'
+    instance_path.write_text(text)
+    module = load_runner(runner)
+    optimum = module.solve(instance_path)['optimum']
+    assert module.main(instance_path, **options)['optimum'] == optimum
+    bounds = check(*output_paths(instance_path))['bounds']
+    assert bounds == ('infeasible' if optimum is None else (optimum, optimum))
+    return optimum
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('options', [dict(), {'prefix_sums': True}, {'prune': True}, {'workers': 2}, {'incremental': True}])
+def test_dag(tmp_path, seed, options):
+    n, edges, text = random_dag(random.Random(seed))
+    assert prove('dag', tmp_path, text, **options) == shortest_path(n, edges)
+    if options.get('incremental'):
+        # The second run copies the blocks of the first
+        assert prove('dag', tmp_path, text, **options) == shortest_path(n, edges)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('options', [dict(), {'prefix_sums': True}, {'workers': 2}, {'incremental': True}])
+def test_interval_scheduling(tmp_path, seed, options):
+    intervals, text = random_intervals(random.Random(seed))
+    assert prove('interval-scheduling', tmp_path, text, **options) == best_schedule(intervals)
+    if options.get('incremental'):
+        assert prove('interval-scheduling', tmp_path, text, **options) == best_schedule(intervals)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_knapsack(tmp_path, seed):
+    capacity, items, text = random_knapsack(random.Random(seed))
+    assert prove('knapsack', tmp_path, text) == best_packing(capacity, items)
@@ -0,0 +1,54 @@
+from pathlib import Path
+import sys
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from prooflog import output_paths
+from prooflog.check import check
+from prooflog.runners import load_runner
+
+
+# Not in topological order: 2 -> 1 and 2 -> 3 after 1 -> 4
+UNORDERED_DAG = '5\n0 2 1\n2 1 1\n1 4 1\n0 3 5\n3 4 5\n2 3 9\n'
+# 2 and 3 do not reach 5, and 0 does not reach 4, all behind negative edges
+PRUNABLE_DAG = '6\n0 1 2\n0 2 -4\n0 5 9\n1 5 3\n2 3 1\n4 5 -7\n'
+
+
+@pytest.fixture
+def run():
+    return load_runner('dag')
+
+
+def write_instance(tmp_path, text, name='instance'):
+    instance_path = tmp_path / f'{name}.txt'
+    instance_path.write_text(text)
+    return instance_path
+
+
+@pytest.mark.parametrize('options', [dict(), {'prefix_sums': True}, {'prune': True}, {'targets': [2, 4]}])
+def test_unordered_dag_is_rejected(run, tmp_path, options):
+    instance_path = write_instance(tmp_path, UNORDERED_DAG)
+    with pytest.raises(ValueError):
+        run.main(instance_path, **options)
+
+
+def test_pruned_proof_concludes_optimum(run, tmp_path):
+    instance_path = write_instance(tmp_path, PRUNABLE_DAG)
+    assert run.solve(instance_path)['optimum'] == 5
+    assert run.main(instance_path, prune=True)['optimum'] == 5
+    assert check(*output_paths(instance_path))['bounds'] == (5, 5)
+
+
+def test_targets_conclude_optimum(run, tmp_path):
+    instance_path = write_instance(tmp_path, PRUNABLE_DAG)
+    optima = run.main(instance_path, targets='all')['optima']
+    assert sorted(optima) == [1, 2, 3, 4, 5]
+    lines = PRUNABLE_DAG.splitlines()
+    for target, optimum in optima.items():
+        # Paths to target only use the vertices up to it
+        edges = [line for line in lines[1:] if int(line.split()[1]) <= target]
+        alone_path = write_instance(tmp_path, f'{target + 1}\n' + ''.join(f'{line}\n' for line in edges), f'up_to_{target}')
+        assert optimum == run.solve(alone_path)['optimum']
+        bounds = check(*run.target_paths(instance_path, target))['bounds']
+        assert bounds == ('infeasible' if optimum is None else (optimum, optimum))
@@ -0,0 +1,41 @@
+from pathlib import Path
+import sys
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from prooflog import output_paths
+from prooflog.check import check
+from prooflog.convert import convert
+from prooflog.runners import load_runner
+
+
+INSTANCES = [
+    '0 5\n',
+    '3 7\n3 4\n4 5\n2 3\n',
+    '4 0\n1 2\n3 1\n2 2\n1 1\n',
+    '5 10\n4 4\n4 4\n5 6\n3 2\n6 7\n',
+]
+
+
+@pytest.fixture
+def run():
+    return load_runner('knapsack')
+
+
+@pytest.mark.parametrize('text', INSTANCES)
+def test_proof_concludes_optimum(run, tmp_path, text):
+    instance_path = tmp_path / 'instance.txt'
+    instance_path.write_text(text)
+    optimum = run.solve(instance_path)['optimum']
+    assert run.main(instance_path)['optimum'] == optimum
+    assert check(*output_paths(instance_path))['bounds'] == (optimum, optimum)
+
+
+def test_binary_instance_gives_same_proof(run, tmp_path):
+    text_path, binary_path = tmp_path / 'instance.txt', tmp_path / 'binary.bin'
+    text_path.write_text(INSTANCES[-1])
+    convert('knapsack', text_path, binary_path)
+    assert run.main(binary_path) == run.main(text_path)
+    for binary_output, text_output in zip(output_paths(binary_path), output_paths(text_path)):
+        assert binary_output.read_bytes() == text_output.read_bytes()
@@ -0,0 +1,37 @@
+from pathlib import Path
+import sys
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from prooflog import output_paths
+from prooflog.check import check
+from prooflog.runners import load_runner
+
+
+# The reachable path of weight 0 leaves no potential or reduced cost to sum
+ZERO_DAG = '3\n0 2 0\n'
+
+
+def prove(runner, tmp_path, text):
+    instance_path = tmp_path / 'instance.txt'
+    instance_path.write_text(text)
+    module = load_runner(runner)
+    optimum = module.main(instance_path, prefix_sums=True)['optimum']
+    assert optimum == module.solve(instance_path)['optimum']
+    return optimum, check(*output_paths(instance_path))['bounds']
+
+
+def test_zero_weight_dag(tmp_path):
+    assert prove('dag', tmp_path, ZERO_DAG) == (0, (0, 0))
+
+
+@pytest.mark.parametrize('text, optimum', [
+    ('1\n5 6 0\n', 0),
+    ('1\n5 5 3\n', -3),
+    ('2\n5 5 3\n1 4 2\n', -5),
+    ('3\n5 5 3\n1 4 2\n2 3 -1\n', -5),
+])
+def test_degenerate_intervals(tmp_path, text, optimum):
+    assert prove('interval-scheduling', tmp_path, text) == (optimum, (optimum, optimum))
+
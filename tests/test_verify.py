@@ -0,0 +1,85 @@
+from pathlib import Path
+import shlex
+import subprocess
+import sys
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from prooflog.runners import RUNNERS, load_runner
+
+
+ROOT = Path(__file__).resolve().parent.parent
+STAND_IN = f'{shlex.quote(sys.executable)} {ROOT / "bench" / "stand_in_verifier.py"} {{formula}} /dev/stdin'
+# Reads the whole proof, then fails
+FAILING = f'{shlex.quote(sys.executable)} -c "import sys; sys.stdin.buffer.read(); sys.exit(3)"'
+
+
+def tiny_instance(runner):
+    if runner == 'dag':
+        return '4\n0 1 2\n0 2 5\n1 2 -1\n1 3 4\n2 3 3\n'
+    if runner == 'knapsack':
+        return '3 7\n3 4\n4 5\n2 3\n'
+    return '3\n0 4 3\n2 6 5\n5 9 4\n'
+
+
+def large_instance(runner):
+    # Proofs of a few MiB, more than the writer and the pipe buffer hold
+    if runner == 'dag':
+        n = 40
+        edges = [f'{u} {v} {(7 * u + 3 * v) % 11 - 5}' for u in range(n) for v in range(u + 1, n)]
+        return f'{n}\n' + '\n'.join(edges) + '\n'
+    if runner == 'knapsack':
+        items = [(7 * i % 23 + 5, 11 * i % 29 + 3) for i in range(30)]
+        return f'{len(items)} {sum(w for w, _ in items) // 2}\n' + ''.join(f'{w} {p}\n' for w, p in items)
+    n = 300
+    return f'{n}\n' + '\n'.join(f'{i} {i + 50} {13 * i % 17 + 1}' for i in range(n)) + '\n'
+
+
+def run(runner, instance_path, command):
+    return subprocess.run(
+        [sys.executable, RUNNERS[runner], instance_path, '--verify', command],
+        capture_output=True, text=True, timeout=300,
+    )
+
+
+@pytest.fixture(params=list(RUNNERS))
+def runner(request):
+    return request.param
+
+
+def test_success_is_reported(runner, tmp_path):
+    instance_path = tmp_path / 'tiny.txt'
+    instance_path.write_text(tiny_instance(runner))
+    result = run(runner, instance_path, STAND_IN)
+    assert result.returncode == 0, result.stderr
+    assert 'verifier exited with status 0 after' in result.stderr
+
+
+def test_failure_is_passed_through(runner, tmp_path):
+    instance_path = tmp_path / 'tiny.txt'
+    instance_path.write_text(tiny_instance(runner))
+    result = run(runner, instance_path, FAILING)
+    assert result.returncode == 3
+    assert 'verifier exited with status 3 after' in result.stderr
+
+
+def test_checker_stopping_early_fails(runner, tmp_path):
+    instance_path = tmp_path / 'large.txt'
+    instance_path.write_text(large_instance(runner))
+    result = run(runner, instance_path, f'{STAND_IN} --stop-after 10')
+    assert result.returncode == 1
+    assert 'Stopped reading after 10 lines' in result.stderr
+    assert 'verifier exited with status 1 after' in result.stderr
+    # Writing stopped on the broken pipe, before the proof was finished
+    summary = load_runner(runner).main(instance_path, verify=f'{STAND_IN} --stop-after 10')
+    assert summary['optimum'] is None
+    assert summary['verifier_status'] == 1
+
+
+def test_summary_has_verifier_seconds(runner, tmp_path):
+    instance_path = tmp_path / 'tiny.txt'
+    instance_path.write_text(tiny_instance(runner))
+    summary = load_runner(runner).main(instance_path, verify=STAND_IN)
+    assert summary['verifier_status'] == 0
+    assert summary['verifier_seconds'] > 0